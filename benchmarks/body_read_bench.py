@@ -0,0 +1,101 @@
+"""
+Reads a large response body in small pieces with HTTPSocketResponse.read(),
+served from memory instead of a real socket. The throughput should stay the
+same for growing body sizes, i.e. the time grows linearly.
+
+The second part compares the body buffer with the former bytearray based
+approach (slice, then delete from the front) when the whole body is already
+buffered.
+"""
+
+import argparse
+import time
+
+from geventhttpclient.response import BodyBuffer, HTTPSocketResponse
+
+
+class MemorySocket:
+    def __init__(self, data, max_recv=64 * 1024):
+        self._data = memoryview(data)
+        self._position = 0
+        self._max_recv = max_recv
+
+    def recv_into(self, buf, nbytes=0):
+        length = min(len(buf), self._max_recv, len(self._data) - self._position)
+        buf[:length] = self._data[self._position : self._position + length]
+        self._position += length
+        return length
+
+    def close(self):
+        pass
+
+
+def make_response(body_size):
+    head = f"HTTP/1.1 200 OK\r\nContent-Length: {body_size}\r\n\r\n".encode()
+    return head + b"x" * body_size
+
+
+def bench_response(body_size, read_size, block_size):
+    sock = MemorySocket(make_response(body_size))
+    now = time.perf_counter()
+    response = HTTPSocketResponse(sock, block_size=block_size)
+    received = 0
+    while True:
+        data = response.read(read_size)
+        if not data:
+            break
+        received += len(data)
+    delta = time.perf_counter() - now
+    assert received == body_size
+    return delta
+
+
+class BytearrayBuffer:
+    """The former body buffer, for comparison"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def append(self, data):
+        self._buf += data
+
+    def read(self, length):
+        data = self._buf[:length]
+        del self._buf[:length]
+        return data[:]
+
+
+def bench_buffer(buffer_type, body_size, read_size, chunk_size=4096):
+    buf = buffer_type()
+    chunk = b"x" * chunk_size
+    for _ in range(body_size // chunk_size):
+        buf.append(chunk)
+    now = time.perf_counter()
+    while buf.read(read_size):
+        pass
+    return time.perf_counter() - now
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100], help="MB")
+    parser.add_argument("--read-size", type=int, default=1024)
+    parser.add_argument("--block-size", type=int, default=HTTPSocketResponse.DEFAULT_BLOCK_SIZE)
+    args = parser.parse_args()
+
+    print(f"HTTPSocketResponse.read({args.read_size})")
+    for size in args.sizes:
+        delta = bench_response(size * 1024 * 1024, args.read_size, args.block_size)
+        print(f"{size:5d} MB: {delta:6.2f}s, {size / delta:8.1f} MB/s")
+
+    print(f"\nfully buffered body, read({args.read_size})")
+    for size in args.sizes:
+        for buffer_type in (BytearrayBuffer, BodyBuffer):
+            delta = bench_buffer(buffer_type, size * 1024 * 1024, args.read_size)
+            print(
+                f"{size:5d} MB {buffer_type.__name__:>15}: {delta:6.2f}s, {size / delta:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
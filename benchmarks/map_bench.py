@@ -0,0 +1,88 @@
+"""
+Benchmark for fanning out many GET requests to one host.
+
+Compares the manual pattern of benchmark.py, a gevent pool spawning a
+greenlet per request around HTTPClient.get(), with HTTPClient.map() and
+HTTPClient.imap_unordered(). Like benchmark.py it is meant to run against
+a fast local HTTP server like nginx.
+"""
+
+import gevent.monkey
+
+gevent.monkey.patch_all()
+
+import argparse
+import time
+
+import gevent.pool
+
+from geventhttpclient import URL, HTTPClient
+
+
+def check(content):
+    assert content
+    assert b"html" in content
+
+
+def manual(client, request_uri, count, concurrency):
+    def request_with_check():
+        check(client.get(request_uri).read())
+
+    pool = gevent.pool.Pool(size=concurrency)
+    for _ in range(count):
+        pool.spawn(request_with_check)
+    pool.join()
+
+
+def map_(client, request_uri, count, concurrency):
+    for response in client.map([request_uri] * count, concurrency=concurrency):
+        check(response.read())
+
+
+def imap_unordered(client, request_uri, count, concurrency):
+    requests = [request_uri] * count
+    for _, response in client.imap_unordered(requests, concurrency=concurrency):
+        check(response.read())
+
+
+available_benchmarks = {
+    "manual": manual,
+    "map": map_,
+    "imap_unordered": imap_unordered,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1/")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--round-size", type=int, default=10000)
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        nargs="+",
+        choices=available_benchmarks.keys(),
+        default=available_benchmarks.keys(),
+    )
+    args = parser.parse_args()
+
+    url = URL(args.url)
+    for name in args.benchmark:
+        benchmark = available_benchmarks[name]
+        print(f"Running {name}")
+        results = []
+        for round in range(1, args.rounds + 1):
+            client = HTTPClient.from_url(url, concurrency=args.concurrency)
+            now = time.perf_counter()
+            benchmark(client, url.request_uri, args.round_size, args.concurrency)
+            rps = args.round_size / (time.perf_counter() - now)
+            results.append(rps)
+            client.close()
+            print(f"round: {round}, rps: {rps:.1f}")
+        print(f"total rps:     {sum(results) / len(results):.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
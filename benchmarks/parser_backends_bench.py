@@ -0,0 +1,111 @@
+"""
+Throughput of the available response parser backends, see
+geventhttpclient.parser. Conformance between the backends is covered by
+tests/test_parser_backends.py.
+
+Reports for every backend the parsed headers per second for small
+responses and the body throughput for a large response with a
+Content-Length and a chunked one, fed in recv sized blocks.
+"""
+
+import argparse
+import time
+
+from parser_bench import HEADERS, make_response, make_small_response
+
+from geventhttpclient.parser import PARSERS
+
+
+def make_chunked_response(body_size, chunk_size):
+    chunk = b"%x\r\n%s\r\n" % (chunk_size, b"x" * chunk_size)
+    count, rest = divmod(body_size, chunk_size)
+    data = [b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n", chunk * count]
+    if rest:
+        data.append(b"%x\r\n%s\r\n" % (rest, b"x" * rest))
+    data.append(b"0\r\n\r\n")
+    return b"".join(data)
+
+
+def make_counting_parser(parser_class):
+    class CountingParser(parser_class):
+        def __init__(self):
+            super().__init__()
+            self.zero_copy_body = True
+            self.headers = 0
+            self.body = 0
+            self.complete = False
+
+        def _on_headers(self, headers):
+            self.headers += len(headers)
+
+        def _on_body(self, data):
+            self.body += len(data)
+
+        def _on_message_complete(self):
+            self.complete = True
+
+    return CountingParser
+
+
+def best_of(rounds, func):
+    best = None
+    for _ in range(rounds):
+        now = time.perf_counter()
+        func()
+        delta = time.perf_counter() - now
+        best = delta if best is None else min(best, delta)
+    return best
+
+
+def bench_headers(parser_class, count, rounds):
+    data = make_small_response()
+
+    def run():
+        for _ in range(count):
+            parser = parser_class()
+            parser.feed(data)
+            assert parser.complete and parser.headers == len(HEADERS)
+
+    return best_of(rounds, run)
+
+
+def bench_body(parser_class, data, block_size, rounds):
+    blocks = [data[i : i + block_size] for i in range(0, len(data), block_size)]
+
+    def run():
+        parser = parser_class()
+        for block in blocks:
+            parser.feed(block)
+        assert parser.complete
+
+    return best_of(rounds, run)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--body-size", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    parser.add_argument("--block-size", type=int, default=64 * 1024)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--responses", type=int, default=20000)
+    args = parser.parse_args()
+
+    bodies = {
+        "content-length": make_response(args.body_size),
+        "chunked": make_chunked_response(args.body_size, args.chunk_size),
+    }
+    for name, parser_class in PARSERS.items():
+        if parser_class is None:
+            print(f"{name:>9}: not available")
+            continue
+        parser_class = make_counting_parser(parser_class)
+        delta = bench_headers(parser_class, args.responses, args.rounds)
+        results = [f"{args.responses * len(HEADERS) / delta:9.0f} headers/s"]
+        for label, data in bodies.items():
+            delta = bench_body(parser_class, data, args.block_size, args.rounds)
+            results.append(f"{label} {args.body_size / delta / 1024**2:7.1f} MB/s")
+        print(f"{name:>9}: " + ", ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Micro benchmarks for the response parser, independent of any network IO.
+
+Headers: parses many small responses with a typical amount of headers and
+reports the parsed headers per second.
+
+Body copies: feeds a large response through HTTPResponse in recv sized
+blocks, once with the body passed to ``_on_body`` as freshly allocated
+bytearrays and once as zero-copy memoryviews into the fed buffer.
+"""
+
+import argparse
+import time
+
+from geventhttpclient.response import HTTPResponse
+
+
+class CountingResponse(HTTPResponse):
+    def __init__(self, zero_copy_body):
+        super().__init__()
+        self.zero_copy_body = zero_copy_body
+        self.parser_copied = 0
+
+    def _on_body(self, buf):
+        if not isinstance(buf, memoryview):
+            # a bytearray allocated by the parser just for this callback
+            self.parser_copied += len(buf)
+        super()._on_body(buf)
+
+
+HEADERS = [
+    ("Date", "Thu, 13 Oct 2011 15:03:12 GMT"),
+    ("Server", "nginx/1.24.0"),
+    ("Content-Type", "application/json; charset=utf-8"),
+    ("Connection", "keep-alive"),
+    ("Cache-Control", "public, max-age=2592000"),
+    ("Expires", "Sat, 12 Nov 2011 15:03:12 GMT"),
+    ("ETag", '"5e8c1a2b-3f"'),
+    ("Last-Modified", "Tue, 07 Apr 2020 06:29:31 GMT"),
+    ("Vary", "Accept-Encoding"),
+    ("X-Request-Id", "4b1e3c2a-9d1f-4c1e-8e7a-1f2b3c4d5e6f"),
+    ("X-Frame-Options", "SAMEORIGIN"),
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+    ("Access-Control-Allow-Origin", "*"),
+    ("Set-Cookie", "session=abcdef0123456789; Path=/; HttpOnly"),
+    ("Set-Cookie", "tracking=0123456789abcdef; Path=/"),
+    ("Accept-Ranges", "bytes"),
+    ("Age", "42"),
+    ("Content-Length", "2"),
+]
+
+
+def make_small_response():
+    head = "".join(f"{field}: {value}\r\n" for field, value in HEADERS)
+    return f"HTTP/1.1 200 OK\r\n{head}\r\n{{}}".encode()
+
+
+def bench_headers(count, rounds):
+    data = make_small_response()
+    best = None
+    for _ in range(rounds):
+        now = time.perf_counter()
+        for _ in range(count):
+            response = HTTPResponse()
+            response.feed(data)
+        delta = time.perf_counter() - now
+        assert response.message_complete
+        assert len(list(response.items())) == len(HEADERS)
+        best = delta if best is None else min(best, delta)
+    return best
+
+
+def make_response(body_size):
+    head = f"HTTP/1.1 200 OK\r\nContent-Length: {body_size}\r\n\r\n".encode()
+    return head + b"x" * body_size
+
+
+def bench_body(data, block_size, zero_copy_body, rounds):
+    blocks = [data[i : i + block_size] for i in range(0, len(data), block_size)]
+    best = None
+    for _ in range(rounds):
+        response = CountingResponse(zero_copy_body)
+        now = time.perf_counter()
+        for block in blocks:
+            response.feed(block)
+        delta = time.perf_counter() - now
+        assert response.message_complete
+        best = delta if best is None else min(best, delta)
+    return best, response.parser_copied
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--body-size", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--block-size", type=int, default=64 * 1024)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--responses", type=int, default=50000)
+    args = parser.parse_args()
+
+    delta = bench_headers(args.responses, args.rounds)
+    print(
+        f"   headers: {args.responses * len(HEADERS) / delta:10.0f} headers/s, "
+        f"{args.responses / delta:8.0f} responses/s"
+    )
+
+    data = make_response(args.body_size)
+    for label, zero_copy_body in (("bytearray", False), ("memoryview", True)):
+        delta, copied = bench_body(data, args.block_size, zero_copy_body, args.rounds)
+        print(
+            f"{label:>10}: {args.body_size / delta / 1024**2:8.1f} MB/s, "
+            f"bytes copied by the parser per response: {copied}"
+        )
+
+
+if __name__ == "__main__":
+    main()
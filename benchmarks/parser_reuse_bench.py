@@ -0,0 +1,91 @@
+"""
+Micro benchmark for reusing one response parser on a keep-alive connection.
+
+Parses a stream of small responses, once with a new HTTPResponse per
+response and once with a single HTTPResponse that is reset() after every
+response. Reports the responses per second and, traced with tracemalloc,
+the peak memory allocated while parsing a response.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from geventhttpclient.response import HTTPResponse
+
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Date: Thu, 13 Oct 2011 15:03:12 GMT\r\n"
+    b"Server: nginx/1.24.0\r\n"
+    b"Content-Type: application/json; charset=utf-8\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Content-Length: 2\r\n\r\n"
+    b"{}"
+)
+
+
+def new_parser():
+    def parse():
+        response = HTTPResponse()
+        response.feed(RESPONSE)
+        assert response.message_complete
+
+    return parse
+
+
+def reset_parser():
+    response = HTTPResponse()
+
+    def parse():
+        response.feed(RESPONSE)
+        assert response.message_complete
+        response.reset()
+
+    return parse
+
+
+def throughput(parse, count, rounds):
+    best = None
+    for _ in range(rounds):
+        now = time.perf_counter()
+        for _ in range(count):
+            parse()
+        delta = time.perf_counter() - now
+        best = delta if best is None else min(best, delta)
+    return count / best
+
+
+def allocated(parse, count):
+    """Peak memory allocated while parsing one response, on average."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(count):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            parse()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=200000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--traced", type=int, default=50)
+    args = parser.parse_args()
+
+    for label, factory in (("new parser", new_parser), ("reset()", reset_parser)):
+        parse = factory()
+        rate = throughput(parse, args.responses, args.rounds)
+        size = allocated(parse, args.traced)
+        print(
+            f"{label:>10}: {rate:8.0f} responses/s, "
+            f"peak {size:6.0f} bytes allocated per response"
+        )
+
+
+if __name__ == "__main__":
+    main()
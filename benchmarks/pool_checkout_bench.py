@@ -0,0 +1,84 @@
+"""
+Micro benchmark for checking a keep-alive socket out of the ConnectionPool.
+
+Opens a lot of file descriptors first, like a process with many concurrent
+pools, so the pooled socket gets a high file descriptor number. Compares
+the liveness probe of the socket with select(), which fails above
+FD_SETSIZE (1024), with poll(), and the checkout with alive_check_grace,
+which skips the probe for recently returned sockets.
+"""
+
+import argparse
+import resource
+import select
+import socket
+import time
+
+from geventhttpclient.connectionpool import ConnectionPool
+
+
+def select_alive(sock):
+    """The former probe of ConnectionPool._is_socket_alive."""
+    try:
+        ready_to_read, _, _ = select.select([sock], [], [], 0.0)
+    except ValueError:
+        return False
+    return not ready_to_read
+
+
+def open_fds(count):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < count + 100:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(count + 100, hard), hard))
+    return [socket.socket() for _ in range(count)]
+
+
+def probe(alive, sock, count):
+    now = time.perf_counter()
+    for _ in range(count):
+        if not alive(sock):
+            return None
+    return count / (time.perf_counter() - now)
+
+
+def checkout(pool, count):
+    now = time.perf_counter()
+    for _ in range(count):
+        pool.return_socket(pool.get_socket())
+    return count / (time.perf_counter() - now)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fds", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    fds = open_fds(args.fds)
+    sock, peer = socket.socketpair()
+    print(f"pooled socket fd: {sock.fileno()}, {len(fds)} other fds open")
+
+    pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80, size=1)
+    for name, alive in [("select", select_alive), ("poll", pool._is_socket_alive)]:
+        rate = probe(alive, sock, args.count)
+        if rate is None:
+            print(f"probe {name:<8} fails, the healthy socket is considered dead")
+        else:
+            print(f"probe {name:<8} {rate:>12.0f} checks/s")
+
+    for grace in (0.0, 1.0):
+        pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80, size=1, alive_check_grace=grace)
+        pool._semaphore.acquire()
+        pool.return_socket(sock)
+        rate = checkout(pool, args.count)
+        print(f"checkout alive_check_grace={grace}: {rate:>12.0f} checkouts/s")
+        pool._socket_queue.get()
+
+    peer.close()
+    sock.close()
+    for fd in fds:
+        fd.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,6 @@ response = client.request(
     headers={"Content-Type": "application/x-www-form-urlencoded", "Accept": "*/*"},
 )
 
-data = json.loads(response.readline())
-while data:
-    pp(data)
-    data = json.loads(response.readline())
+for line in response.iter_lines(b"\r\n"):
+    if line:
+        pp(json.loads(line))
@@ -12,53 +12,183 @@ enum py_parser_should_keep_alive {
     KA_TRUE,
 };
 
+/* Python level callbacks, looked up by name once per parser */
+enum py_parser_callback {
+    CB_MESSAGE_BEGIN,
+    CB_STATUS,
+    CB_HEADERS,
+    CB_HEADERS_COMPLETE,
+    CB_BODY,
+    CB_MESSAGE_COMPLETE,
+    CB_COUNT,
+};
+
+static const char* callback_names[CB_COUNT] = {
+    "_on_message_begin",
+    "_on_status",
+    "_on_headers",
+    "_on_headers_complete",
+    "_on_body",
+    "_on_message_complete",
+};
+
+typedef struct {
+    /* NULL if not defined */
+    PyObject* func;
+    /* plain function from the class, which has to be called with self as
+     * first argument. Avoids a reference cycle through a bound method. */
+    int pass_self;
+} py_parser_callback_t;
+
+/* growing buffer for header fragments, which might span several feed() calls */
+typedef struct {
+    char* data;
+    size_t length;
+    size_t size;
+} py_parser_buffer_t;
+
 typedef struct {
     PyObject_HEAD
+    /* points to parser_state, kept for the existing self->parser accesses */
     llhttp_t* parser;
+    llhttp_t parser_state;
     llhttp_errno_t error;
     const char* reason;
     enum py_parser_should_keep_alive should_keep_alive;
+    int zero_copy_body;
+    int callbacks_bound;
+    py_parser_callback_t callbacks[CB_COUNT];
+    py_parser_buffer_t header_field;
+    py_parser_buffer_t header_value;
+    /* list of complete (field, value) tuples not yet passed to _on_headers */
+    PyObject* headers;
+    /* error while completing a header, reported by the next callback */
+    int header_failed;
+    /* object passed to the running feed(), its data and the byte view of
+     * it the zero-copy body views are sliced from, created on demand */
+    PyObject* feed_obj;
+    const char* feed_start;
+    PyObject* feed_view;
 } PyHTTPResponseParser;
 
-static int on_message_begin(llhttp_t* parser)
+static int buffer_append(py_parser_buffer_t* buffer, const char* at, size_t length)
 {
-    int fail = 0;
-    PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
-    PyObject* callable = PyObject_GetAttrString((PyObject*)self, "_on_message_begin");
-    if (callable) {
-        PyObject* result = PyObject_CallObject(callable, NULL);
-        PyObject* exception = PyErr_Occurred();
-        if (exception != NULL) {
-            fail = -1;
-        } else {
-            if (PyObject_IsTrue(result))
-                fail = -1;
+    if (buffer->length + length > buffer->size) {
+        size_t size = buffer->size ? buffer->size : 64;
+        char* data;
+        while (size < buffer->length + length)
+            size *= 2;
+        data = PyMem_Realloc(buffer->data, size);
+        if (data == NULL) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        buffer->data = data;
+        buffer->size = size;
+    }
+    memcpy(buffer->data + buffer->length, at, length);
+    buffer->length += length;
+    return 0;
+}
+
+static void buffer_free(py_parser_buffer_t* buffer)
+{
+    PyMem_Free(buffer->data);
+    buffer->data = NULL;
+    buffer->length = 0;
+    buffer->size = 0;
+}
+
+static void unbind_callbacks(PyHTTPResponseParser* self)
+{
+    int i;
+    for (i = 0; i < CB_COUNT; i++) {
+        Py_CLEAR(self->callbacks[i].func);
+        self->callbacks[i].pass_self = 0;
+    }
+    self->callbacks_bound = 0;
+}
+
+/* Resolve all callbacks at once, instead of an attribute lookup per event.
+ * This happens on the first feed(), so callbacks replaced on the instance
+ * after construction are still picked up. */
+static int bind_callbacks(PyHTTPResponseParser* self)
+{
+    int i;
+    for (i = 0; i < CB_COUNT; i++) {
+        PyObject* callable = PyObject_GetAttrString((PyObject*)self, callback_names[i]);
+        if (callable == NULL) {
+            if (!PyErr_ExceptionMatches(PyExc_AttributeError)) {
+                unbind_callbacks(self);
+                return -1;
+            }
+            PyErr_Clear();
+            continue;
         }
-        Py_XDECREF(result);
-        Py_DECREF(callable);
+        if (PyMethod_Check(callable) && PyMethod_GET_SELF(callable) == (PyObject*)self) {
+            PyObject* func = PyMethod_GET_FUNCTION(callable);
+            Py_INCREF(func);
+            Py_DECREF(callable);
+            callable = func;
+            self->callbacks[i].pass_self = 1;
+        }
+        self->callbacks[i].func = callable;
     }
+    self->callbacks_bound = 1;
+    return 0;
+}
+
+/* Returns a new reference to the result, NULL on error or if the
+ * callback isn't defined (without an exception set in that case). */
+static PyObject* call_callback(PyHTTPResponseParser* self, enum py_parser_callback cb, PyObject* arg)
+{
+    PyObject* stack[3];
+    size_t nargs = 0;
+    py_parser_callback_t* callback = &self->callbacks[cb];
+
+    if (callback->func == NULL)
+        return NULL;
+    stack[0] = NULL;
+    if (callback->pass_self)
+        stack[1 + nargs++] = (PyObject*)self;
+    if (arg != NULL)
+        stack[1 + nargs++] = arg;
+    return PyObject_Vectorcall(
+        callback->func, stack + 1, nargs | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+}
+
+/* 0 => continue, -1 => error or callback returned a true value */
+static int check_result(PyObject* result)
+{
+    int fail = 0;
+    if (PyErr_Occurred() != NULL) {
+        fail = -1;
+    } else if (result != NULL && PyObject_IsTrue(result)) {
+        fail = -1;
+    }
+    Py_XDECREF(result);
     return fail;
 }
 
+static int flush_headers(PyHTTPResponseParser* self);
+
+static int on_message_begin(llhttp_t* parser)
+{
+    PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
+    /* llhttp only clears the remaining length while consuming a body. After
+     * a skipped body (HEAD) it would add up with the next Content-Length. */
+    parser->content_length = 0;
+    return check_result(call_callback(self, CB_MESSAGE_BEGIN, NULL));
+}
+
 static int on_message_complete(llhttp_t* parser)
 {
-    int fail = 0;
     PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
     self->should_keep_alive = llhttp_should_keep_alive(parser) ? KA_TRUE : KA_FALSE;
-    PyObject* callable = PyObject_GetAttrString((PyObject*)self, "_on_message_complete");
-    if (callable) {
-        PyObject* result = PyObject_CallObject(callable, NULL);
-        PyObject* exception = PyErr_Occurred();
-        if (exception != NULL) {
-            fail = -1;
-        } else {
-            if (PyObject_IsTrue(result))
-                fail = -1;
-        }
-        Py_XDECREF(result);
-        Py_DECREF(callable);
-    }
-    return fail;
+    /* trailers of a chunked response */
+    if (flush_headers(self) < 0)
+        return -1;
+    return check_result(call_callback(self, CB_MESSAGE_COMPLETE, NULL));
 }
 
 static int on_headers_complete(llhttp_t* parser)
@@ -66,107 +196,207 @@ static int on_headers_complete(llhttp_t* parser)
     /* 1 => skip body, 2 => upgrade, 0 => continue, -1 => error */
     int skip_body = 0;
     PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
-    PyObject* callable = PyObject_GetAttrString((PyObject*)self, "_on_headers_complete");
-    if (callable) {
-        PyObject* result = PyObject_CallObject(callable, NULL);
-        PyObject* exception = PyErr_Occurred();
-        if (exception != NULL) {
-            skip_body = -1;
-        } else if (PyObject_IsTrue(result)) {
-            skip_body = 1;
-        }
-        Py_XDECREF(result);
-        Py_DECREF(callable);
+    if (flush_headers(self) < 0)
+        return -1;
+    PyObject* result = call_callback(self, CB_HEADERS_COMPLETE, NULL);
+    if (PyErr_Occurred() != NULL) {
+        skip_body = -1;
+    } else if (result != NULL && PyObject_IsTrue(result)) {
+        skip_body = 1;
     }
+    Py_XDECREF(result);
     return skip_body;
 }
 
-static int on_http_data_cb(llhttp_t* parser, const char *at, size_t length, const char * python_cb)
+static int on_http_data_cb(llhttp_t* parser, const char *at, size_t length, enum py_parser_callback cb)
 {
-    int fail = 0;
+    PyObject* result;
     PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
-    PyObject* callable = PyObject_GetAttrString((PyObject*)self, python_cb);
-    if (callable) {
-        PyObject* args = Py_BuildValue("(s#)", at, length);
-        PyObject* result = PyObject_CallObject(callable, args);
-        PyObject* exception = PyErr_Occurred();
-        if (exception != NULL) {
-            fail = -1;
-        } else {
-            if (PyObject_IsTrue(result))
-                fail = -1;
-        }
-        Py_XDECREF(result);
-        Py_DECREF(callable);
-        Py_DECREF(args);
-    }
-    return fail;
+    if (self->callbacks[cb].func == NULL)
+        return 0;
+    PyObject* string = PyUnicode_FromStringAndSize(at, length);
+    if (string == NULL)
+        return -1;
+    result = call_callback(self, cb, string);
+    Py_DECREF(string);
+    return check_result(result);
 }
 
 static int on_status(llhttp_t* parser, const char *at, size_t length)
 {
-    return on_http_data_cb(parser, at, length, "_on_status");
+    return on_http_data_cb(parser, at, length, CB_STATUS);
 }
 
 static int on_header_field(llhttp_t* parser, const char *at, size_t length)
 {
-    return on_http_data_cb(parser, at, length, "_on_header_field");
+    PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
+    if (self->header_failed)
+        return -1;
+    return buffer_append(&self->header_field, at, length);
 }
 
 static int on_header_value(llhttp_t* parser, const char *at, size_t length)
 {
-    return on_http_data_cb(parser, at, length, "_on_header_value");
+    PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
+    if (self->header_failed)
+        return -1;
+    return buffer_append(&self->header_value, at, length);
+}
+
+static int on_header_value_complete(llhttp_t* parser)
+{
+    /* the return value of this callback is ignored by llhttp */
+    PyObject* header;
+    PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
+    if (self->header_failed)
+        return -1;
+    if (self->headers == NULL) {
+        self->headers = PyList_New(0);
+        if (self->headers == NULL)
+            goto fail;
+    }
+    /* data stays NULL for empty values, which s# would turn into None */
+    header = Py_BuildValue("(s#s#)",
+        self->header_field.length ? self->header_field.data : "",
+        (Py_ssize_t)self->header_field.length,
+        self->header_value.length ? self->header_value.data : "",
+        (Py_ssize_t)self->header_value.length);
+    if (header == NULL)
+        goto fail;
+    if (PyList_Append(self->headers, header) < 0) {
+        Py_DECREF(header);
+        goto fail;
+    }
+    Py_DECREF(header);
+    self->header_field.length = 0;
+    self->header_value.length = 0;
+    return 0;
+
+fail:
+    self->header_failed = 1;
+    return -1;
+}
+
+/* pass the collected headers (or trailers) to _on_headers at once */
+static int flush_headers(PyHTTPResponseParser* self)
+{
+    int fail;
+    PyObject* headers = self->headers;
+    if (self->header_failed)
+        return -1;
+    if (headers == NULL || PyList_GET_SIZE(headers) == 0)
+        return 0;
+    self->headers = NULL;
+    fail = check_result(call_callback(self, CB_HEADERS, headers));
+    Py_DECREF(headers);
+    return fail;
+}
+
+/* Read-only, one-dimensional byte view of the object passed to feed(). */
+static int make_feed_view(PyHTTPResponseParser* self)
+{
+    PyObject* view;
+    PyObject* converted;
+    Py_buffer* buffer;
+    if (PyUnicode_Check(self->feed_obj)) {
+        /* a str exports no buffer, view its UTF-8 bytes instead */
+        PyObject* bytes = PyUnicode_AsUTF8String(self->feed_obj);
+        if (bytes == NULL)
+            return -1;
+        view = PyMemoryView_FromObject(bytes);
+        Py_DECREF(bytes);
+    } else {
+        view = PyMemoryView_FromObject(self->feed_obj);
+    }
+    if (view == NULL)
+        return -1;
+    buffer = PyMemoryView_GET_BUFFER(view);
+    if (buffer->ndim != 1 || (buffer->format != NULL && strcmp(buffer->format, "B") != 0)) {
+        converted = PyObject_CallMethod(view, "cast", "s", "B");
+        Py_DECREF(view);
+        if (converted == NULL)
+            return -1;
+        view = converted;
+    }
+    if (!PyMemoryView_GET_BUFFER(view)->readonly) {
+        converted = PyObject_CallMethod(view, "toreadonly", NULL);
+        Py_DECREF(view);
+        if (converted == NULL)
+            return -1;
+        view = converted;
+    }
+    self->feed_view = view;
+    return 0;
 }
 
 static int on_body(llhttp_t* parser, const char *at, size_t length)
 {
-    int fail = 0;
+    int fail;
+    PyObject* body;
+    Py_ssize_t offset;
     PyHTTPResponseParser *self = (PyHTTPResponseParser*) parser->data;
-    PyObject* callable = PyObject_GetAttrString((PyObject*)self, "_on_body");
-    if (callable) {
-        PyObject* bytearray = PyByteArray_FromStringAndSize(at, length);
-        PyObject* result = PyObject_CallFunctionObjArgs(
-            callable, bytearray, NULL);
-        PyObject* exception = PyErr_Occurred();
-        if (exception != NULL) {
+    if (self->callbacks[CB_BODY].func == NULL)
+        return 0;
+    if (self->zero_copy_body) {
+        /* read-only view into the object passed to feed(). Views derived
+         * from it keep that object alive, but see later changes of its
+         * data, so callbacks have to copy what they keep. */
+        if (self->feed_view == NULL && make_feed_view(self) < 0)
+            return -1;
+        offset = at - self->feed_start;
+        body = PySequence_GetSlice(self->feed_view, offset, offset + (Py_ssize_t)length);
+    } else {
+        body = PyByteArray_FromStringAndSize(at, length);
+    }
+    if (body == NULL)
+        return -1;
+    fail = check_result(call_callback(self, CB_BODY, body));
+    if (self->zero_copy_body) {
+        /* release the view itself, so keeping it by mistake fails loudly */
+        PyObject *type, *value, *traceback;
+        PyErr_Fetch(&type, &value, &traceback);
+        PyObject* released = PyObject_CallMethod(body, "release", NULL);
+        if (released == NULL) {
             fail = -1;
+            if (type != NULL) {
+                PyErr_Clear();
+            }
         } else {
-            if (PyObject_IsTrue(result))
-                fail = -1;
+            Py_DECREF(released);
+        }
+        if (type != NULL) {
+            PyErr_Restore(type, value, traceback);
         }
-        Py_XDECREF(result);
-        Py_DECREF(callable);
-        Py_DECREF(bytearray);
     }
+    Py_DECREF(body);
     return fail;
 }
 
 static llhttp_settings_t _parser_settings = {
-    on_message_begin,
-    NULL, // on_url
-    on_status,
-    on_header_field,
-    on_header_value,
-    on_headers_complete,
-    on_body,
-    on_message_complete
+    .on_message_begin = on_message_begin,
+    .on_status = on_status,
+    .on_header_field = on_header_field,
+    .on_header_value = on_header_value,
+    .on_headers_complete = on_headers_complete,
+    .on_body = on_body,
+    .on_message_complete = on_message_complete,
+    .on_header_value_complete = on_header_value_complete,
 };
 
 static PyObject*
 PyHTTPResponseParser_new(PyTypeObject* type, PyObject* args, PyObject* kwds)
 {
+    /* tp_alloc zeroes the whole object, including the embedded parser */
     PyHTTPResponseParser* self = (PyHTTPResponseParser*)type->tp_alloc(type, 0);
     if (self != NULL) {
-        self->parser = PyMem_Malloc(sizeof(llhttp_t));
-        if (self->parser == NULL) {
-            return NULL;
-        } else {
-            llhttp_init(self->parser, HTTP_RESPONSE, &_parser_settings);
-            self->parser->data = (void*)self;
-            self->error = HPE_OK;
-            self->reason = 0;
-            self->should_keep_alive = KA_INCOMPLETE;
-        }
+        self->parser = &self->parser_state;
+        llhttp_init(self->parser, HTTP_RESPONSE, &_parser_settings);
+        self->parser->data = (void*)self;
+        self->error = HPE_OK;
+        self->reason = 0;
+        self->should_keep_alive = KA_INCOMPLETE;
+        self->zero_copy_body = 0;
+        self->callbacks_bound = 0;
     }
     return (PyObject*) self;
 }
@@ -180,48 +410,100 @@ static void* set_parser_exception(PyHTTPResponseParser *parser)
     return NULL;
 }
 
-static size_t size_t_MAX = -1;
+/* Fill data with the bytes of a str (UTF-8 encoded) or of any object
+ * supporting the buffer protocol, without copying. The buffer has to be
+ * released with PyBuffer_Release. */
+static int get_feed_buffer(PyObject* obj, Py_buffer* data)
+{
+    if (PyUnicode_Check(obj)) {
+        Py_ssize_t length;
+        const char* utf8 = PyUnicode_AsUTF8AndSize(obj, &length);
+        if (utf8 == NULL)
+            return -1;
+        /* the UTF-8 representation is cached on the str object */
+        return PyBuffer_FillInfo(data, obj, (void*)utf8, length, 1, PyBUF_SIMPLE);
+    }
+    if (!PyObject_CheckBuffer(obj)) {
+        PyErr_Format(PyExc_TypeError,
+            "feed() argument must be str or a bytes-like object, not '%.200s'",
+            Py_TYPE(obj)->tp_name);
+        return -1;
+    }
+    /* any C-contiguous buffer, e.g. a memoryview slice of a receive buffer */
+    return PyObject_GetBuffer(obj, data, PyBUF_SIMPLE);
+}
 
 static PyObject*
-PyHTTPResponseParser_feed(PyHTTPResponseParser *self, PyObject* args)
-{
-    char* buf = NULL;
-    Py_ssize_t buf_len;
-    int succeed = PyArg_ParseTuple(args, "s#", &buf, &buf_len);
-    /* cast Py_ssize_t signed integer to unsigned */
-    size_t unsigned_buf_len = buf_len + size_t_MAX + 1;
-    if (succeed) {
-        PyObject * exception;
-
-        /* in case feed is called again after an error occurred */
-        if (self->error != HPE_OK) {
-            return set_parser_exception(self);
-        }
+PyHTTPResponseParser_feed(PyHTTPResponseParser *self, PyObject* obj)
+{
+    Py_buffer data;
+    PyObject* exception;
+    PyObject* outer_obj = self->feed_obj;
+    const char* outer_start = self->feed_start;
+    PyObject* outer_view = self->feed_view;
+
+    if (get_feed_buffer(obj, &data) < 0)
+        return NULL;
+
+    if (!self->callbacks_bound && bind_callbacks(self) < 0) {
+        PyBuffer_Release(&data);
+        return NULL;
+    }
 
-        if (buf_len) {
-            self->error = llhttp_execute(self->parser, buf, unsigned_buf_len);
-            self->reason = self->parser->reason;
-        } else {
-            if (!llhttp_message_needs_eof(self->parser)) {
-                PyErr_SetString(PyExc_HTTPParseError, "Incomplete response.");
-                return NULL;
-            }
-            self->error = llhttp_finish(self->parser);
-            self->reason = self->parser->reason;
-        }
+    /* in case feed is called again after an error occurred */
+    if (self->error != HPE_OK) {
+        PyBuffer_Release(&data);
+        return set_parser_exception(self);
+    }
 
-        /* Exception in callbacks */
-        exception = PyErr_Occurred();
-        if (exception != NULL)
+    if (data.len) {
+        self->feed_obj = obj;
+        self->feed_start = data.buf;
+        self->feed_view = NULL;
+        self->error = llhttp_execute(self->parser, data.buf, (size_t)data.len);
+        self->reason = self->parser->reason;
+        /* restore the state of a feed() call from a callback */
+        Py_XDECREF(self->feed_view);
+        self->feed_obj = outer_obj;
+        self->feed_start = outer_start;
+        self->feed_view = outer_view;
+    } else {
+        if (!llhttp_message_needs_eof(self->parser)) {
+            PyBuffer_Release(&data);
+            PyErr_SetString(PyExc_HTTPParseError, "Incomplete response.");
             return NULL;
-
-        if (self->error != HPE_OK) {
-            return set_parser_exception(self);
         }
+        self->error = llhttp_finish(self->parser);
+        self->reason = self->parser->reason;
+    }
+    PyBuffer_Release(&data);
+
+    /* Exception in callbacks */
+    exception = PyErr_Occurred();
+    if (exception != NULL)
+        return NULL;
 
-        Py_RETURN_NONE;
+    if (self->error != HPE_OK) {
+        return set_parser_exception(self);
     }
-    return NULL;
+
+    Py_RETURN_NONE;
+}
+
+static PyObject*
+PyHTTPResponseParser_reset(PyHTTPResponseParser* self)
+{
+    /* Bound callbacks and the allocated header buffers are kept, which is
+     * what makes reusing a parser cheaper than creating a new one. */
+    llhttp_reset(self->parser);
+    self->error = HPE_OK;
+    self->reason = 0;
+    self->should_keep_alive = KA_INCOMPLETE;
+    self->header_field.length = 0;
+    self->header_value.length = 0;
+    self->header_failed = 0;
+    Py_CLEAR(self->headers);
+    Py_RETURN_NONE;
 }
 
 static PyObject*
@@ -284,17 +566,40 @@ PyHTTPResponseParser_should_keep_alive(PyHTTPResponseParser* self)
     return PyBool_FromLong(should_keep_alive);
 }
 
+static int
+PyHTTPResponseParser_traverse(PyHTTPResponseParser* self, visitproc visit, void* arg)
+{
+    int i;
+    for (i = 0; i < CB_COUNT; i++) {
+        Py_VISIT(self->callbacks[i].func);
+    }
+    Py_VISIT(self->headers);
+    return 0;
+}
+
+static int
+PyHTTPResponseParser_clear(PyHTTPResponseParser* self)
+{
+    unbind_callbacks(self);
+    Py_CLEAR(self->headers);
+    return 0;
+}
+
 void
 PyHTTPResponseParser_dealloc(PyHTTPResponseParser* self)
 {
-    self->parser->data = NULL;
-    PyMem_Free(self->parser);
+    PyObject_GC_UnTrack(self);
+    unbind_callbacks(self);
+    Py_CLEAR(self->headers);
+    buffer_free(&self->header_field);
+    buffer_free(&self->header_value);
     Py_TYPE(self)->tp_free((PyObject*)self);
 }
 
 static PyMethodDef PyHTTPResponseParser_methods[] = {
-    {"feed", (PyCFunction)PyHTTPResponseParser_feed, METH_VARARGS,
-        "Feed the parser with data"},
+    {"feed", (PyCFunction)PyHTTPResponseParser_feed, METH_O,
+        "Feed the parser with data, a str or any bytes-like object.\n"
+        "An empty string signals the end of the response."},
     {"get_code", (PyCFunction)PyHTTPResponseParser_get_code, METH_NOARGS,
         "Get http response code"},
     {"get_http_version", (PyCFunction)PyHTTPResponseParser_get_http_version, METH_NOARGS,
@@ -309,6 +614,41 @@ static PyMethodDef PyHTTPResponseParser_methods[] = {
     {"parser_failed", (PyCFunction)PyHTTPResponseParser_parser_failed,
         METH_NOARGS,
         "Tell if parser have failed."},
+    {"reset", (PyCFunction)PyHTTPResponseParser_reset, METH_NOARGS,
+        "Prepare the parser for the next response on the same connection"},
+    {NULL}  /* Sentinel */
+};
+
+static PyObject*
+PyHTTPResponseParser_get_zero_copy_body(PyHTTPResponseParser* self, void* closure)
+{
+    return PyBool_FromLong(self->zero_copy_body);
+}
+
+static int
+PyHTTPResponseParser_set_zero_copy_body(PyHTTPResponseParser* self, PyObject* value, void* closure)
+{
+    int enabled;
+    if (value == NULL) {
+        PyErr_SetString(PyExc_AttributeError, "can't delete zero_copy_body");
+        return -1;
+    }
+    enabled = PyObject_IsTrue(value);
+    if (enabled < 0)
+        return -1;
+    self->zero_copy_body = enabled;
+    return 0;
+}
+
+static PyGetSetDef PyHTTPResponseParser_getset[] = {
+    {"zero_copy_body",
+        (getter)PyHTTPResponseParser_get_zero_copy_body,
+        (setter)PyHTTPResponseParser_set_zero_copy_body,
+        "Pass body fragments to _on_body as read-only memoryviews into the fed\n"
+        "buffer instead of copying them into a new bytearray. The views are\n"
+        "released as soon as the callback returns. Slices of them keep the fed\n"
+        "object alive, but see later changes of its data, so copy what you keep.",
+        NULL},
     {NULL}  /* Sentinel */
 };
 
@@ -332,17 +672,17 @@ static PyTypeObject HTTPParserType = {
     0,                         /*tp_getattro*/
     0,                         /*tp_setattro*/
     0,                         /*tp_as_buffer*/
-    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE, /*tp_flags*/
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC, /*tp_flags*/
     "HTTP Response parser (non thread-safe)",           /* tp_doc */
-    0,                         /* tp_traverse */
-    0,                         /* tp_clear */
+    (traverseproc)PyHTTPResponseParser_traverse, /* tp_traverse */
+    (inquiry)PyHTTPResponseParser_clear,         /* tp_clear */
     0,                         /* tp_richcompare */
     0,                         /* tp_weaklistoffset */
     0,                         /* tp_iter */
     0,                         /* tp_iternext */
     PyHTTPResponseParser_methods,      /* tp_methods */
     0,                         /* tp_members */
-    0,                         /* tp_getset */
+    PyHTTPResponseParser_getset,       /* tp_getset */
     0,                         /* tp_base */
     0,                         /* tp_dict */
     0,                         /* tp_descr_get */
@@ -14,6 +14,8 @@ http_parser = Extension(
         "ext",
         "llhttp/include",
     ],
+    # falls back to the pure Python parser if the extension can't be built
+    optional=True,
 )
 
 setup(
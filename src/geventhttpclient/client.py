@@ -1,15 +1,29 @@
 import errno
 import os
+import time
+from collections import deque
+from collections.abc import Mapping
+from functools import partial
+from itertools import islice
 
+import gevent.pool
 import gevent.socket
 
 from geventhttpclient import __version__
-from geventhttpclient.connectionpool import ConnectionPool
+from geventhttpclient.connectionpool import ConnectionPool, merge_stats
+from geventhttpclient.futures import RequestFuture
 from geventhttpclient.header import Headers
-from geventhttpclient.response import HTTPConnectionClosed, HTTPSocketPoolResponse
+from geventhttpclient.response import (
+    HTTPConnectionClosed,
+    HTTPParseError,
+    HTTPPipelineParser,
+    HTTPSocketPoolResponse,
+    _deadline_timer,
+)
 from geventhttpclient.url import URL
 
 CRLF = "\r\n"
+CRLF_BYTES = b"\r\n"
 WHITESPACE = " "
 FIELD_VALUE_SEP = ": "
 HOST_PORT_SEP = ":"
@@ -18,6 +32,8 @@ PROTO_HTTP = "http"
 PROTO_HTTPS = "https"
 HEADER_HOST = "Host"
 HEADER_CONTENT_LENGTH = "Content-Length"
+HEADER_TRANSFER_ENCODING = "Transfer-Encoding"
+LAST_CHUNK = b"0\r\n\r\n"
 
 METHOD_GET = "GET"
 METHOD_HEAD = "HEAD"
@@ -27,6 +43,17 @@ METHOD_DELETE = "DELETE"
 METHOD_PATCH = "PATCH"
 METHOD_OPTIONS = "OPTIONS"
 METHOD_TRACE = "TRACE"
+# safe to repeat and without body, so they can be pipelined
+PIPELINE_METHODS = frozenset((METHOD_GET, METHOD_HEAD, METHOD_OPTIONS, METHOD_TRACE))
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+# Without sendmsg (e.g. SSL sockets) buffers up to this size get joined, so
+# that a small head and body don't end up in separate packets or records.
+SEND_COALESCE_SIZE = 16 * 1024
 
 
 def _get_body_length(body):
@@ -37,6 +64,8 @@ def _get_body_length(body):
     :return:
     :rtype: int
     """
+    if isinstance(body, (list, tuple)):
+        return sum(memoryview(part).nbytes for part in body)
     try:
         return len(body)
     except TypeError:
@@ -46,11 +75,134 @@ def _get_body_length(body):
             return None
 
 
+def _encode_header_line(field, value):
+    return (field + FIELD_VALUE_SEP + str(value) + CRLF).encode()
+
+
+def _iter_header_items(headers):
+    """Iterate over the field-value pairs in the same way Headers.update()
+    consumes them."""
+    # Headers is a dict as well, its items() include the duplicate fields
+    if isinstance(headers, dict):
+        return headers.items()
+    if isinstance(headers, Mapping) or hasattr(headers, "keys"):
+        return ((field, headers[field]) for field in headers.keys())
+    return headers
+
+
+def _get_body_parts(body):
+    """
+    Get the body as list of bytes-like parts to be sent in order, None for
+    files which are passed to sendfile.
+    """
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return [body]
+    if isinstance(body, (list, tuple)):
+        return list(body)
+    return None
+
+
+def _is_body_stream(body):
+    """
+    Whether the body is an iterable or readable object of unknown length,
+    which gets sent chunk by chunk while it is consumed.
+    """
+    if not body or isinstance(body, (str, bytes, bytearray, memoryview, list, tuple)):
+        return False
+    if hasattr(body, "read"):
+        # files with a known size are passed to sendfile
+        return _get_body_length(body) is None
+    return hasattr(body, "__iter__")
+
+
+def _iter_body_stream(body, block_size):
+    if not hasattr(body, "read"):
+        yield from body
+        return
+    while True:
+        data = body.read(block_size)
+        if not data:
+            return
+        yield data
+
+
+def _send_stream(sock, head, chunks, chunked=True):
+    """
+    Send the head and the body, one chunk at a time. The next chunk is only
+    pulled from the iterable after the previous one got sent, so a slow peer
+    holds back the producer and memory use doesn't depend on the body size.
+    """
+    pending = [head]
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        length = memoryview(chunk).nbytes
+        if not length:
+            # an empty chunk would terminate the body
+            continue
+        if chunked:
+            pending += (b"%x\r\n" % length, chunk, CRLF_BYTES)
+        else:
+            pending.append(chunk)
+        _sendall_buffers(sock, pending)
+        pending = []
+    if chunked:
+        pending.append(LAST_CHUNK)
+    if pending:
+        _sendall_buffers(sock, pending)
+
+
+def _sendall_buffers(sock, buffers):
+    """
+    Send all buffers in order, without joining them into a single payload
+    first. Uses sendmsg (writev) where available.
+    """
+    views = [memoryview(buffer).cast("B") for buffer in buffers]
+    views = [view for view in views if len(view)]
+    if len(views) == 1:
+        sock.sendall(views[0])
+        return
+    index = 0
+    while index < len(views):
+        try:
+            sent = sock.sendmsg(views[index : index + IOV_MAX])
+        except (AttributeError, NotImplementedError):
+            # SSL sockets refuse sendmsg, as it would bypass the encryption
+            _sendall_coalesced(sock, views[index:])
+            return
+        while sent:
+            length = len(views[index])
+            if sent < length:
+                views[index] = views[index][sent:]
+                break
+            sent -= length
+            index += 1
+
+
+def _sendall_coalesced(sock, views):
+    pending = bytearray()
+    for view in views:
+        if len(pending) + len(view) <= SEND_COALESCE_SIZE:
+            pending += view
+            continue
+        if pending:
+            sock.sendall(pending)
+            pending.clear()
+        if len(view) < SEND_COALESCE_SIZE:
+            pending += view
+        else:
+            sock.sendall(view)
+    if pending:
+        sock.sendall(pending)
+
+
 class HTTPClient:
     HTTP_11 = "HTTP/1.1"
     HTTP_10 = "HTTP/1.0"
 
     BLOCK_SIZE = 1024 * 4  # 4KB
+    EXPECT_CONTINUE_TIMEOUT = 1.0
+    PIPELINE_DEPTH = 8
 
     DEFAULT_HEADERS = Headers({"User-Agent": "python/gevent-http-client-" + __version__})
 
@@ -81,6 +233,14 @@ class HTTPClient:
         proxy_port=None,
         version=HTTP_11,
         headers_type=Headers,
+        expect_continue_timeout=EXPECT_CONTINUE_TIMEOUT,
+        happy_eyeballs_delay=None,
+        resolver=None,
+        alive_check_grace=0.0,
+        idle_timeout=None,
+        max_lifetime=None,
+        max_requests=None,
+        min_idle=0,
     ):
         if headers is None:
             headers = headers_type()
@@ -122,6 +282,13 @@ class HTTPClient:
                 connection_timeout=connection_timeout,
                 disable_ipv6=disable_ipv6,
                 use_proxy=self.use_proxy,
+                happy_eyeballs_delay=happy_eyeballs_delay,
+                resolver=resolver,
+                alive_check_grace=alive_check_grace,
+                idle_timeout=idle_timeout,
+                max_lifetime=max_lifetime,
+                max_requests=max_requests,
+                min_idle=min_idle,
             )
         else:
             self.ssl = False
@@ -139,13 +306,25 @@ class HTTPClient:
                 connection_timeout=connection_timeout,
                 disable_ipv6=disable_ipv6,
                 use_proxy=self.use_proxy,
+                happy_eyeballs_delay=happy_eyeballs_delay,
+                resolver=resolver,
+                alive_check_grace=alive_check_grace,
+                idle_timeout=idle_timeout,
+                max_lifetime=max_lifetime,
+                max_requests=max_requests,
+                min_idle=min_idle,
             )
         self.version = version
         self.headers_type = headers_type
-        self.default_headers = headers_type()
-        self.default_headers.update(self.DEFAULT_HEADERS)
-        self.default_headers.update(headers)
+        self._default_headers = headers_type()
+        self._default_headers.update(self.DEFAULT_HEADERS)
+        self._default_headers.update(headers)
+        self._default_header_lines = None
+        # set once the headers passed through the default_headers property,
+        # from then on they may get modified in place
+        self._default_header_items = None
         self.block_size = block_size
+        self.expect_continue_timeout = expect_continue_timeout
 
         scheme = PROTO_HTTPS if self.ssl else PROTO_HTTP
         port_str = f":{port}" if port else ""
@@ -154,43 +333,66 @@ class HTTPClient:
     def close(self):
         self._connection_pool.close()
 
-    # Like urllib2, try to treat the body as a file if we can't determine the
-    # file length with `len()`
-
-    def _build_request(self, method, request_uri, body="", headers=None):
+    def warm(self, count=None):
         """
-
-        :param method:
-        :type method: str or bytes
-        :param request_uri:
-        :type request_uri: str or bytes
-        :param body:
-        :type body: str or bytes or file
-        :param headers:
-        :type headers: dict
-        :return:
-        :rtype: str or bytes
+        Open up to count connections in the background, all the concurrency
+        allows by default, so the first requests don't wait for handshakes.
+        Returns the greenlets opening them.
         """
-
-        if headers is None:
-            headers = {}
-
-        header_fields = self.headers_type()
-        header_fields.update(self.default_headers)
-        header_fields.update(headers)
-        if self.version == self.HTTP_11 and HEADER_HOST not in header_fields:
-            host_port = self.host
-            # IPv6 addresses require square brackets in the Host header.
-            if ":" in self.host and self.host[0] != "[" and self.host[-1] != "]":
-                host_port = "[" + host_port + "]"
-            if self.port not in (80, 443):
-                host_port += HOST_PORT_SEP + str(self.port)
-            header_fields[HEADER_HOST] = host_port
-        if body and HEADER_CONTENT_LENGTH not in header_fields:
-            body_length = _get_body_length(body)
-            if body_length:
-                header_fields[HEADER_CONTENT_LENGTH] = body_length
-
+        return self._connection_pool.warm(count)
+
+    def stats(self):
+        """Counters and gauges of the connection pool, see PoolStats."""
+        return self._connection_pool.stats()
+
+    @property
+    def default_headers(self):
+        if self._default_header_items is None:
+            self._default_header_items = list(_iter_header_items(self._default_headers))
+        return self._default_headers
+
+    @default_headers.setter
+    def default_headers(self, headers):
+        self._default_headers = headers
+        self._default_header_lines = None
+        self._default_header_items = list(_iter_header_items(headers))
+
+    def _host_header_value(self):
+        host_port = self.host
+        # IPv6 addresses require square brackets in the Host header.
+        if ":" in self.host and self.host[0] != "[" and self.host[-1] != "]":
+            host_port = "[" + host_port + "]"
+        if self.port not in (80, 443):
+            host_port += HOST_PORT_SEP + str(self.port)
+        return host_port
+
+    def _get_default_header_lines(self):
+        """
+        The default headers, encoded once: a list of (lowered field, line)
+        tuples, the joined block of all lines, the Host line if needed and
+        whether they contain a Content-Length.
+        """
+        if self._default_header_items is not None:
+            items = list(_iter_header_items(self._default_headers))
+            if items != self._default_header_items:
+                self._default_header_items = items
+                self._default_header_lines = None
+        if self._default_header_lines is None:
+            header_fields = self.headers_type()
+            header_fields.update(self._default_headers)
+            lines = [
+                (field.lower(), _encode_header_line(field, value))
+                for field, value in header_fields.items()
+            ]
+            host_line = b""
+            if self.version == self.HTTP_11 and HEADER_HOST not in header_fields:
+                host_line = _encode_header_line(HEADER_HOST, self._host_header_value())
+            block = b"".join(line for _, line in lines)
+            has_content_length = HEADER_CONTENT_LENGTH in header_fields
+            self._default_header_lines = lines, block, host_line, has_content_length
+        return self._default_header_lines
+
+    def _build_request_url(self, request_uri):
         request_url = request_uri
         if self.use_proxy:
             base_url = self._base_url_string
@@ -204,68 +406,366 @@ class HTTPClient:
                 request_url = request_url[len(self._base_url_string) - 1 :]
             else:
                 raise ValueError("Invalid host in URL")
+        return request_url
 
-        request = method + WHITESPACE + request_url + WHITESPACE + self.version + CRLF
+    def _build_request(self, method, request_uri, body="", headers=None):
+        """
 
-        for field, value in header_fields.items():
-            request += field + FIELD_VALUE_SEP + str(value) + CRLF
-        request += CRLF
-        return request
+        :param method:
+        :type method: str or bytes
+        :param request_uri:
+        :type request_uri: str or bytes
+        :param body:
+        :type body: str or bytes or file
+        :param headers:
+        :type headers: dict
+        :return:
+        :rtype: str
+        """
+        return self._build_request_head(method, request_uri, body, headers).decode()
+
+    def _has_header(self, field, headers=None):
+        """Whether the default or the request headers contain the lowercase
+        field."""
+        if any(name == field for name, _ in self._get_default_header_lines()[0]):
+            return True
+        if not headers:
+            return False
+        return any(name.lower() == field for name, _ in _iter_header_items(headers))
+
+    def _expects_continue(self, headers=None):
+        """Whether the request has an Expect: 100-continue header. Request
+        headers replace the default ones with the same field."""
+        for header_items in (headers, self._default_headers):
+            if not header_items:
+                continue
+            values = [
+                str(value).strip(" \t").lower()
+                for field, value in _iter_header_items(header_items)
+                if field.lower() == "expect"
+            ]
+            if values:
+                return "100-continue" in values
+        return False
+
+    def _build_request_head(self, method, request_uri, body=b"", headers=None, chunked=False):
+        """
+        Serialize request line and headers into a bytearray. The default
+        headers are encoded once and only the per request headers are
+        serialized on every call. The result is the same as merging them
+        with headers_type.update().
+
+        With chunked, a Transfer-Encoding header is added unless one is set.
+        """
+        request_url = self._build_request_url(request_uri)
+        head = bytearray(
+            (method + WHITESPACE + request_url + WHITESPACE + self.version + CRLF).encode()
+        )
+        lines, block, host_line, has_content_length = self._get_default_header_lines()
+
+        has_transfer_encoding = False
+        if not headers:
+            head += block
+            has_host = not host_line
+        else:
+            overrides = {}
+            for field, value in _iter_header_items(headers):
+                # last one wins, like headers_type.update()
+                overrides[field.lower()] = field, value
+            has_host = not host_line or "host" in overrides
+            has_content_length = has_content_length or "content-length" in overrides
+            has_transfer_encoding = "transfer-encoding" in overrides
+            for field, line in lines:
+                override = overrides.pop(field, None)
+                head += line if override is None else _encode_header_line(*override)
+            for field, value in overrides.values():
+                head += _encode_header_line(field, value)
+
+        if not has_host:
+            head += host_line
+        if chunked and not has_transfer_encoding:
+            if not any(field == "transfer-encoding" for field, _ in lines):
+                head += _encode_header_line(HEADER_TRANSFER_ENCODING, "chunked")
+        if body and not has_content_length:
+            body_length = _get_body_length(body)
+            if body_length:
+                head += _encode_header_line(HEADER_CONTENT_LENGTH, body_length)
+        head += CRLF_BYTES
+        return head
 
-    def request(self, method, request_uri, body=b"", headers=None):
+    def request(
+        self,
+        method,
+        request_uri,
+        body=b"",
+        headers=None,
+        timeout=None,
+        connection_timeout=None,
+        network_timeout=None,
+    ):
         """
 
         :param method:
         :param request_uri:
-        :param body: byte or file
+        :param body: bytes-like, str, file, a list of bytes-like parts or an
+            iterable producing the body in chunks
         :param headers:
+        :param timeout: total seconds for the request, from waiting for a
+            connection to reading the last byte of the body
+        :param connection_timeout: overrides the connection_timeout of the
+            client for this request
+        :param network_timeout: overrides the network_timeout of the client
+            while the connection is used by this request
         :return:
+
+        Iterables and files of unknown size are streamed with chunked
+        transfer encoding, unless the headers contain a Content-Length.
+        Those can only be consumed once, so the request is not retried.
+
+        With an ``Expect: 100-continue`` header the body is held back until
+        the server answers with 100 Continue, at most expect_continue_timeout
+        seconds. If it responds with a final status instead, e.g. 413, the
+        body is not sent at all.
+
+        connection_timeout and network_timeout apply to single socket
+        operations, a server trickling data keeps a request alive forever.
+        The timeout bounds the whole request including retries, reading the
+        response raises HTTPDeadlineExceeded once it is over.
         """
 
         if isinstance(body, str):
             body = body.encode("utf-8")
+        elif isinstance(body, (list, tuple)):
+            body = [part.encode("utf-8") if isinstance(part, str) else part for part in body]
+
+        stream = None
+        chunked = False
+        if _is_body_stream(body):
+            stream = body
+            body = None
+            chunked = not self._has_header("content-length", headers)
+            if chunked and self.version != self.HTTP_11:
+                raise ValueError(
+                    f"Chunked request bodies need {self.HTTP_11}, set a Content-Length header"
+                )
 
-        request = self._build_request(method.upper(), request_uri, body=body, headers=headers)
-
-        attempts_left = self._connection_pool.size + 1
-
-        while 1:
-            sock = self._connection_pool.get_socket()
-            try:
-                _request = request.encode()
-                if body:
-                    if isinstance(body, bytes):
-                        sock.sendall(_request + body)
+        # built once, also for all retries
+        request = self._build_request_head(
+            method.upper(), request_uri, body=body, headers=headers, chunked=chunked
+        )
+        body_parts = _get_body_parts(body)
+        continue_timeout = None
+        if (stream is not None or body) and self._expects_continue(headers):
+            continue_timeout = self.expect_continue_timeout
+
+        attempts_left = 0 if stream is not None else self._connection_pool.size + 1
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with _deadline_timer(deadline):
+            while 1:
+                sock = self._connection_pool.get_socket(connection_timeout)
+                try:
+                    if network_timeout is not None:
+                        # restored when the connection returns to the pool
+                        sock.settimeout(network_timeout)
+                    if continue_timeout is not None:
+                        # the body follows once the server asked for it
+                        sock.sendall(request)
                     else:
-                        sock.sendall(_request)
-                        # TODO: Support non file-like iterables, e.g. `(u"string1", u"string2")`.
-                        sock.sendfile(body)
+                        self._send_request(sock, request, body, body_parts, stream, chunked)
+                except gevent.socket.error as e:
+                    self._connection_pool.release_socket(sock)
+                    if e.errno in (errno.ECONNRESET, errno.EPIPE) and attempts_left > 0:
+                        attempts_left -= 1
+                        continue
+                    raise e
+                except BaseException:
+                    # e.g. the body producer failed, the request is incomplete
+                    self._connection_pool.release_socket(sock)
+                    raise
+
+                try:
+                    response = HTTPSocketPoolResponse(
+                        sock,
+                        self._connection_pool,
+                        block_size=self.block_size,
+                        method=method.upper(),
+                        headers_type=self.headers_type,
+                        continue_timeout=continue_timeout,
+                        deadline=deadline,
+                    )
+                    if continue_timeout is not None and not response.headers_complete:
+                        # 100 Continue or no answer in time, a final status
+                        # like 413 skips the body and closes the connection
+                        try:
+                            self._send_request(sock, b"", body, body_parts, stream, chunked)
+                        except BaseException:
+                            response.release()
+                            raise
+                        response._body_pending = False
+                        response._read_headers()
+                except HTTPConnectionClosed as e:
+                    # connection is released by the response itself
+                    if attempts_left > 0:
+                        attempts_left -= 1
+                        continue
+                    raise e
                 else:
-                    sock.sendall(_request)
-            except gevent.socket.error as e:
-                self._connection_pool.release_socket(sock)
-                if (e.errno == errno.ECONNRESET or e.errno == errno.EPIPE) and attempts_left > 0:
-                    attempts_left -= 1
-                    continue
-                raise e
-
-            try:
-                response = HTTPSocketPoolResponse(
-                    sock,
-                    self._connection_pool,
-                    block_size=self.block_size,
-                    method=method.upper(),
-                    headers_type=self.headers_type,
-                )
-            except HTTPConnectionClosed as e:
-                # connection is released by the response itself
-                if attempts_left > 0:
-                    attempts_left -= 1
-                    continue
-                raise e
+                    response._sent_request = bytes(request)
+                    return response
+
+    def request_async(self, method, request_uri, body=b"", headers=None, **kw):
+        """
+        Like request(), but runs in a new greenlet and returns a
+        RequestFuture for the response right away.
+        """
+        return RequestFuture(self.request, method, request_uri, body=body, headers=headers, **kw)
+
+    def _send_request(self, sock, head, body, body_parts, stream, chunked):
+        if stream is not None:
+            _send_stream(sock, head, _iter_body_stream(stream, self.block_size), chunked)
+        elif body_parts is not None:
+            # head and body are sent as separate buffers, the body is never
+            # copied
+            _sendall_buffers(sock, [head, *body_parts])
+        elif body:
+            if head:
+                sock.sendall(head)
+            sock.sendfile(body)
+        else:
+            sock.sendall(head)
+
+    def pipeline(self, requests, depth=PIPELINE_DEPTH):
+        """
+        Send requests back-to-back on one connection, without waiting for
+        the responses in between, and yield the responses in request order.
+
+        :param requests: request URIs or (method, request_uri[, headers])
+            tuples. Only GET, HEAD, OPTIONS and TRACE can be pipelined.
+        :param depth: maximum number of requests awaiting their response
+        :return: iterator over HTTPPipelinedResponse objects, the body of
+            each one is read completely
+
+        If the server closes the connection before all requests are
+        answered, the remaining ones are sent again on a new connection.
+        """
+        pending = deque()
+        for item in requests:
+            if isinstance(item, str):
+                method, request_uri, headers = METHOD_GET, item, None
             else:
-                response._sent_request = request
-                return response
+                method, request_uri, headers = (*item, None)[:3]
+            method = method.upper()
+            if method not in PIPELINE_METHODS:
+                raise ValueError(f"{method} requests can't be pipelined")
+            head = self._build_request_head(method, request_uri, headers=headers)
+            pending.append((method, head))
+        # validated right away, not on the first iteration
+        return self._pipeline(pending, depth)
+
+    def _pipeline(self, pending, depth):
+        attempts_left = self._connection_pool.size + 1
+        while pending:
+            answered = 0
+            for response in self._pipeline_connection(pending, depth):
+                answered += 1
+                yield response
+            if pending and not answered:
+                if attempts_left <= 0:
+                    raise HTTPConnectionClosed("connection closed.")
+                attempts_left -= 1
+
+    def _pipeline_connection(self, pending, depth):
+        """
+        Pipeline the pending (method, head) requests on one connection and
+        yield the responses, until all are answered or the connection gets
+        closed. Answered requests are removed from pending.
+        """
+        sock = self._connection_pool.get_socket()
+        recv_view = memoryview(self._connection_pool.get_recv_buffer(sock, self.block_size))
+        parser = HTTPPipelineParser(headers_type=self.headers_type)
+        in_flight = 0
+        reusable = False
+        try:
+            while pending:
+                count = min(depth, len(pending)) - in_flight
+                if count > 0 and not parser.closing:
+                    heads = []
+                    for method, head in islice(pending, in_flight, in_flight + count):
+                        parser.expect(method)
+                        heads.append(head)
+                    _sendall_buffers(sock, heads)
+                    in_flight += count
+                length = sock.recv_into(recv_view)
+                try:
+                    parser.feed(recv_view[:length])
+                except HTTPParseError:
+                    if length:
+                        raise
+                    # closed in the middle of a response, which is repeated
+                while parser.responses:
+                    response = parser.responses.popleft()
+                    response._sent_request = bytes(pending.popleft()[1])
+                    in_flight -= 1
+                    yield response
+                if not length or parser.closing:
+                    return
+            reusable = True
+        except gevent.socket.error as e:
+            if e.errno not in (errno.ECONNRESET, errno.EPIPE):
+                raise
+        finally:
+            if reusable:
+                self._connection_pool.return_socket(sock)
+            else:
+                self._connection_pool.release_socket(sock)
+
+    def imap_unordered(self, requests, concurrency=None, buffer_body=True, return_exceptions=True):
+        """
+        Send the requests concurrently and yield (request, response) pairs
+        as soon as each one completes.
+
+        :param requests: request URIs or (method, request_uri[, body[, headers]])
+            tuples, like the arguments of request()
+        :param concurrency: requests in flight, the size of the connection
+            pool by default
+        :param buffer_body: read every body completely, so the connection is
+            released before the response is yielded. Otherwise each response
+            holds its connection until the body is read: read or release it
+            before iterating further, or the remaining requests wait for a
+            connection forever.
+        :param return_exceptions: yield the exception of a failed request in
+            place of the response, instead of raising it
+        """
+        pool = gevent.pool.Pool(concurrency or self._connection_pool.size)
+        func = partial(
+            self._batch_request, buffer_body=buffer_body, return_exceptions=return_exceptions
+        )
+        # finished results don't pile up if the consumer is slower
+        return pool.imap_unordered(func, requests, maxsize=pool.size)
+
+    def map(self, requests, concurrency=None, return_exceptions=True):
+        """
+        Send the requests concurrently and return the list of responses in
+        the order of the requests, see imap_unordered() for the arguments.
+        The bodies are always read completely, as unread responses would
+        hold their connections until all requests are done.
+        """
+        pool = gevent.pool.Pool(concurrency or self._connection_pool.size)
+        func = partial(self._batch_request, buffer_body=True, return_exceptions=return_exceptions)
+        return [response for _, response in pool.imap(func, requests)]
+
+    def _batch_request(self, request, buffer_body, return_exceptions):
+        args = (METHOD_GET, request) if isinstance(request, str) else request
+        try:
+            response = self.request(*args)
+            if buffer_body:
+                response.preload()
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return request, e
+        return request, response
 
     def get(self, request_uri, headers={}):
         return self.request(METHOD_GET, request_uri, headers=headers)
@@ -312,6 +812,10 @@ class HTTPClientPool:
             self.clients[client_key] = client
             return client
 
+    def stats(self):
+        """Connection pool stats of all clients summed up."""
+        return merge_stats(client.stats() for client in self.clients.values())
+
     def close(self):
         for client in self.clients.values():
             client.close()
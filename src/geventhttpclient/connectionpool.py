@@ -1,10 +1,25 @@
 import os
 import socket
 import select
+import time
+import weakref
+from collections import deque
+from itertools import chain, zip_longest
 
 import gevent.queue
 import gevent.socket
 from gevent import lock
+from gevent.monkey import get_original
+
+try:
+    # the blocking original, gevent removes select.poll when patching
+    _poll, _POLLIN, _POLLERR, _POLLHUP = get_original(
+        "select", ["poll", "POLLIN", "POLLERR", "POLLHUP"]
+    )
+    _POLL_EVENTS = _POLLIN | _POLLERR | _POLLHUP
+except AttributeError:
+    # Windows
+    _poll = None
 
 _CA_CERTS = None
 
@@ -34,6 +49,96 @@ DEFAULT_NETWORK_TIMEOUT = 5.0
 IGNORED = object()
 
 
+def _interleave_families(sock_infos):
+    """Reorder getaddrinfo() results to alternate between the address
+    families, starting with the first one, like RFC 8305 recommends.
+    """
+    by_family = {}
+    for sock_info in sock_infos:
+        by_family.setdefault(sock_info[0], []).append(sock_info)
+    return [
+        sock_info
+        for sock_info in chain.from_iterable(zip_longest(*by_family.values()))
+        if sock_info is not None
+    ]
+
+
+class PoolStats:
+    """Counters of a ConnectionPool. Besides the counters, snapshot() has
+    gauges of the current pool state and the time callers waited for a
+    connection slot, as a histogram with cumulative counts per upper bound
+    in seconds.
+    """
+
+    WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, float("inf"))
+    COUNTERS = ("created", "connect_errors", "reused", "dead", "expired", "discarded")
+
+    def __init__(self):
+        # new connections and failures to open one
+        self.created = 0
+        self.connect_errors = 0
+        # idle connections handed out again
+        self.reused = 0
+        # idle connections closed by the peer, found by the alive check
+        self.dead = 0
+        # closed by idle_timeout, max_lifetime or max_requests
+        self.expired = 0
+        # not reusable after a request, e.g. Connection: close or errors
+        self.discarded = 0
+        self.waits = [0] * len(self.WAIT_BUCKETS)
+        self.wait_time = 0.0
+
+    def observe_wait(self, seconds):
+        self.wait_time += seconds
+        for index, bound in enumerate(self.WAIT_BUCKETS):
+            if seconds <= bound:
+                self.waits[index] += 1
+                return
+
+    def snapshot(self, pool):
+        stats = {name: getattr(self, name) for name in self.COUNTERS}
+        stats.update(
+            size=pool.size,
+            idle=pool._socket_queue.qsize(),
+            in_use=pool.size - pool._semaphore.counter,
+            waiting=pool._semaphore.linkcount(),
+            wait_count=sum(self.waits),
+            wait_time=self.wait_time,
+        )
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(self.WAIT_BUCKETS, self.waits):
+            cumulative += count
+            histogram[bound] = cumulative
+        stats["wait_histogram"] = histogram
+        return stats
+
+
+def merge_stats(snapshots):
+    """Sum up PoolStats snapshots of several pools."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, value in snapshot.items():
+            if isinstance(value, dict):
+                histogram = merged.setdefault(name, dict.fromkeys(value, 0))
+                for bound, count in value.items():
+                    histogram[bound] += count
+            else:
+                merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+def _reap(pool_ref, interval):
+    """Reaper greenlet, it doesn't keep the pool alive."""
+    while True:
+        gevent.sleep(interval)
+        pool = pool_ref()
+        if pool is None or pool._closed:
+            return
+        pool.reap()
+        del pool
+
+
 class ConnectionPool:
     DEFAULT_CONNECTION_TIMEOUT = 5.0
     DEFAULT_NETWORK_TIMEOUT = 5.0
@@ -49,6 +154,14 @@ class ConnectionPool:
         connection_timeout=DEFAULT_CONNECTION_TIMEOUT,
         network_timeout=DEFAULT_NETWORK_TIMEOUT,
         use_proxy=False,
+        happy_eyeballs_delay=None,
+        resolver=None,
+        alive_check_grace=0.0,
+        idle_timeout=None,
+        max_lifetime=None,
+        max_requests=None,
+        reap_interval=None,
+        min_idle=0,
     ):
         self._closed = False
         self._connection_host = connection_host
@@ -57,19 +170,56 @@ class ConnectionPool:
         self._request_port = request_port
         self._semaphore = lock.BoundedSemaphore(size)
         self._socket_queue = gevent.queue.LifoQueue(size)
+        self._recv_buffers = {}
+        # socket -> time.monotonic() it was returned, for alive_check_grace
+        # and idle_timeout
+        self._returned_at = {}
+        # socket -> time.monotonic() it was connected, for max_lifetime
+        self._created_at = {}
+        # socket -> number of requests, for max_requests
+        self._uses = {}
         self._use_proxy = use_proxy
 
         self.connection_timeout = connection_timeout
         self.network_timeout = network_timeout
         self.size = size
         self.disable_ipv6 = disable_ipv6
+        # seconds between racing connection attempts, None to try the
+        # addresses one after another
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        # anything with a getaddrinfo() method, e.g. a CachingResolver
+        self.resolver = resolver
+        # sockets returned less than this many seconds ago are reused
+        # without checking whether the peer closed them meanwhile
+        self.alive_check_grace = alive_check_grace
+        # idle sockets are closed after idle_timeout seconds, all sockets
+        # after max_lifetime seconds or max_requests requests
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.max_requests = max_requests
+        self._stats = PoolStats()
+        # idle connections kept open, see warm()
+        self.min_idle = min_idle
+        self._warming = 0
+        self._reaper = None
+        if reap_interval is None:
+            limits = [limit for limit in (idle_timeout, max_lifetime) if limit is not None]
+            if limits:
+                reap_interval = min(limits) / 2
+        if reap_interval:
+            self._reaper = gevent.spawn(_reap, weakref.ref(self), reap_interval)
+        if min_idle:
+            self.warm(min_idle)
 
     def _resolve(self):
         """resolve (dns) socket information needed to connect it."""
         family = 0
         if self.disable_ipv6:
             family = gevent.socket.AF_INET
-        info = gevent.socket.getaddrinfo(
+        getaddrinfo = gevent.socket.getaddrinfo
+        if self.resolver is not None:
+            getaddrinfo = self.resolver.getaddrinfo
+        info = getaddrinfo(
             self._connection_host,
             self._connection_port,
             family,
@@ -79,28 +229,60 @@ class ConnectionPool:
         # family, socktype, proto, canonname, sockaddr = info[0]
         return info
 
+    def stats(self):
+        """Snapshot of the pool counters and gauges as dict, see PoolStats."""
+        return self._stats.snapshot(self)
+
     def close(self):
         self._closed = True
+        if self._reaper is not None:
+            self._reaper.kill(block=False)
         while not self._socket_queue.empty():
             try:
                 sock = self._socket_queue.get(block=False)
-                try:
-                    sock.close()
-                except:  # noqa
-                    pass
+                self._close_socket(sock)
             except gevent.queue.Empty:
                 pass
+        self._recv_buffers.clear()
+        self._returned_at.clear()
+        self._created_at.clear()
+        self._uses.clear()
+
+    def _close_socket(self, sock):
+        self._recv_buffers.pop(sock, None)
+        self._returned_at.pop(sock, None)
+        self._created_at.pop(sock, None)
+        self._uses.pop(sock, None)
+        try:
+            sock.close()
+        except:  # noqa
+            pass
+
+    def get_recv_buffer(self, sock, size):
+        """get the receive buffer owned by a pooled socket. It lives as long
+        as the connection, so keep-alive requests don't allocate new ones.
+        """
+        buf = self._recv_buffers.get(sock)
+        if buf is None or len(buf) < size:
+            buf = self._recv_buffers[sock] = bytearray(size)
+        return buf
 
     def _create_tcp_socket(self, family, socktype, protocol):
         """tcp socket factory."""
         sock = gevent.socket.socket(family, socktype, protocol)
         return sock
 
-    def _create_socket(self):
+    def _create_socket(self, connection_timeout=None):
         """might be overridden and super for wrapping into a ssl socket
-        or set tcp/socket options
+        or set tcp/socket options. connection_timeout is only passed for
+        requests with their own connection timeout, overrides have to
+        accept it for those.
         """
+        if connection_timeout is None:
+            connection_timeout = self.connection_timeout
         sock_infos = self._resolve()
+        if self.happy_eyeballs_delay is not None and len(sock_infos) > 1:
+            return self._race_connections(_interleave_families(sock_infos), connection_timeout)
         first_error = None
         for sock_info in sock_infos:
             try:
@@ -111,24 +293,78 @@ class ConnectionPool:
                 continue
 
             try:
-                sock.settimeout(self.connection_timeout)
-                sock = self._connect_socket(sock, sock_info[-1])
-                self.after_connect(sock)
-                sock.settimeout(self.network_timeout)
-                return sock
+                return self._connect_sock_info(sock, sock_info, connection_timeout)
             except OSError as e:
-                sock.close()
                 if not first_error:
                     first_error = e
-            except:  # noqa
-                sock.close()
-                raise
 
         if first_error:
             raise first_error
         else:
             raise RuntimeError(f"Cannot resolve {self._connection_host}:{self._connection_port}")
 
+    def _connect_sock_info(self, sock, sock_info, connection_timeout):
+        """Connect sock to the address of the getaddrinfo() result sock_info,
+        closing it on failure."""
+        try:
+            sock.settimeout(connection_timeout)
+            sock = self._connect_socket(sock, sock_info[-1])
+            self.after_connect(sock)
+            sock.settimeout(self.network_timeout)
+            return sock
+        except:  # noqa
+            sock.close()
+            raise
+
+    def _race_connections(self, sock_infos, connection_timeout):
+        """Happy Eyeballs (RFC 8305): start a connection attempt to the next
+        address every happy_eyeballs_delay seconds, or as soon as the
+        previous one failed, and keep the first one to succeed. The other
+        attempts are cancelled.
+        """
+        finished = gevent.queue.Queue()
+
+        def attempt(sock_info):
+            try:
+                sock = self._create_tcp_socket(*sock_info[:3])
+                sock = self._connect_sock_info(sock, sock_info, connection_timeout)
+            except Exception as e:
+                finished.put((None, e))
+            else:
+                finished.put((sock, None))
+
+        pending = deque(sock_infos)
+        attempts = []
+        running = 0
+        first_error = None
+        try:
+            while pending or running:
+                if pending:
+                    attempts.append(gevent.spawn(attempt, pending.popleft()))
+                    running += 1
+                try:
+                    sock, error = finished.get(
+                        timeout=self.happy_eyeballs_delay if pending else None
+                    )
+                except gevent.queue.Empty:
+                    # no result within the delay, start the next attempt
+                    continue
+                running -= 1
+                if sock is not None:
+                    return sock
+                if not isinstance(error, OSError):
+                    raise error
+                if not first_error:
+                    first_error = error
+        finally:
+            gevent.killall(attempts)
+            # attempts which connected as well, after the winner
+            while not finished.empty():
+                sock, _ = finished.get()
+                if sock is not None:
+                    sock.close()
+        raise first_error
+
     def after_connect(self, sock):
         pass
 
@@ -154,8 +390,9 @@ class ConnectionPool:
     def _is_socket_alive(self, sock):
         """Check if a socket is still connected and alive.
 
-        Uses select() to check if socket is readable. An idle keep-alive socket
-        should NOT be readable.
+        An idle keep-alive socket should NOT be readable, if it is the peer
+        closed it or sent unexpected data. Uses a non-blocking poll(), which
+        unlike select() works for file descriptors above FD_SETSIZE.
 
         Returns False if connection is closed or broken.
         """
@@ -163,20 +400,122 @@ class ConnectionPool:
             return False
         try:
             # Proactive check: A closed socket has a fileno of -1.
-            if sock.fileno() < 0:
-                return False
-            # If the socket is readable while idle, it's either a FIN or dirty.
-            ready_to_read, _, _ = select.select([sock], [], [], 0.0)
-            if ready_to_read:
+            fileno = sock.fileno()
+            if fileno < 0:
                 return False
-            
-            return True
+            if _poll is None:
+                ready_to_read, _, _ = select.select([sock], [], [], 0.0)
+                return not ready_to_read
+            poller = _poll()
+            poller.register(fileno, _POLL_EVENTS)
+            return not poller.poll(0)
         except (OSError, ValueError, socket.error):
             return False
 
-    def get_socket(self):
-        """get a socket from the pool. This blocks until one is available."""
-        self._semaphore.acquire()
+    def _is_expired(self, sock, now):
+        """Whether sock was idle for idle_timeout or exceeded max_lifetime."""
+        if self.idle_timeout is not None:
+            returned_at = self._returned_at.get(sock)
+            if returned_at is not None and now - returned_at >= self.idle_timeout:
+                return True
+        if self.max_lifetime is not None:
+            created_at = self._created_at.get(sock)
+            if created_at is not None and now - created_at >= self.max_lifetime:
+                return True
+        return False
+
+    def reap(self):
+        """Close the idle sockets which expired or which the peer closed.
+        Runs every reap_interval seconds in the background. Returns the
+        number of closed sockets.
+        """
+        now = time.monotonic()
+        keep = []
+        closed = 0
+        while not self._socket_queue.empty():
+            sock = self._socket_queue.get(block=False)
+            if self._is_expired(sock, now):
+                self._stats.expired += 1
+            elif not self._is_socket_alive(sock):
+                self._stats.dead += 1
+            else:
+                keep.append(sock)
+                continue
+            self._close_socket(sock)
+            closed += 1
+        # put back in the same order, the most recently used one last
+        for sock in reversed(keep):
+            self._socket_queue.put(sock, block=False)
+        if self.min_idle:
+            self._keep_min_idle()
+        return closed
+
+    def warm(self, count=None):
+        """Open connections in the background until count of them are idle
+        in the pool, all of them by default. Returns the greenlets doing it,
+        join them to wait for the connections. Connections which fail to
+        open are skipped.
+        """
+        if count is None:
+            count = self.size
+        # idle sockets don't hold the semaphore, so its counter is the
+        # number of idle sockets the pool has room for
+        missing = min(count, self._semaphore.counter) - self._socket_queue.qsize() - self._warming
+        greenlets = []
+        for _ in range(missing):
+            self._warming += 1
+            greenlets.append(gevent.spawn(self._warm_socket))
+        return greenlets
+
+    def _keep_min_idle(self):
+        """Warm connections if fewer than min_idle are idle and the pool has
+        room for more, called after every change of the idle ones."""
+        idle = self._socket_queue.qsize()
+        if idle + self._warming < self.min_idle and idle < self._semaphore.counter:
+            self.warm(self.min_idle)
+
+    def _warm_socket(self):
+        try:
+            # idle sockets don't hold the semaphore, but count for the size
+            if self._closed or self._semaphore.counter <= self._socket_queue.qsize():
+                return
+            self._semaphore.acquire()
+            try:
+                sock = self._create_socket()
+            except Exception:
+                self._stats.connect_errors += 1
+                self._semaphore.release()
+                return
+            self._stats.created += 1
+            self._track_new_socket(sock, uses=0)
+            self.return_socket(sock)
+        finally:
+            self._warming -= 1
+
+    def _track_new_socket(self, sock, uses):
+        if self.max_lifetime is not None:
+            self._created_at[sock] = time.monotonic()
+        if self.max_requests is not None:
+            self._uses[sock] = uses
+
+    def _is_recently_returned(self, sock):
+        returned_at = self._returned_at.get(sock)
+        return returned_at is not None and time.monotonic() - returned_at < self.alive_check_grace
+
+    def get_socket(self, connection_timeout=None):
+        """get a socket from the pool. This blocks until one is available.
+
+        A connection_timeout overrides the one of the pool, in case a new
+        connection has to be established.
+        """
+        if self._semaphore.counter > 0:
+            # no waiting, spare the clock
+            self._semaphore.acquire()
+            self._stats.waits[0] += 1
+        else:
+            start = time.monotonic()
+            self._semaphore.acquire()
+            self._stats.observe_wait(time.monotonic() - start)
         if self._closed:
             raise RuntimeError("connection pool closed")
 
@@ -184,44 +523,71 @@ class ConnectionPool:
         while not self._socket_queue.empty():
             try:
                 sock = self._socket_queue.get(block=False)
-                if self._is_socket_alive(sock):
+                if (
+                    self.idle_timeout is not None or self.max_lifetime is not None
+                ) and self._is_expired(sock, time.monotonic()):
+                    self._stats.expired += 1
+                    self._close_socket(sock)
+                elif self._is_recently_returned(sock) or self._is_socket_alive(sock):
                     # Connection is still alive, return it
+                    self._stats.reused += 1
+                    if self.max_requests is not None:
+                        self._uses[sock] = self._uses.get(sock, 0) + 1
+                    if self.min_idle:
+                        self._keep_min_idle()
                     return sock
                 else:
                     # Connection is dead, close it and try next
-                    try:
-                        sock.close()
-                    except:  # noqa
-                        pass
+                    self._stats.dead += 1
+                    self._close_socket(sock)
             except gevent.queue.Empty:
                 break
 
         # No valid connections in pool, create a new one
         try:
-            return self._create_socket()
+            if connection_timeout is None:
+                # overrides of _create_socket() might not take the argument
+                sock = self._create_socket()
+            else:
+                sock = self._create_socket(connection_timeout)
         except:  # noqa
+            self._stats.connect_errors += 1
             self._semaphore.release()
             raise
+        self._stats.created += 1
+        self._track_new_socket(sock, uses=1)
+        if self.min_idle:
+            self._keep_min_idle()
+        return sock
 
     def return_socket(self, sock):
         """return a socket to the pool."""
         if self._closed:
-            try:
-                sock.close()
-            except:  # noqa
-                pass
+            self._close_socket(sock)
+            return
+        if self.max_requests is not None and self._uses.get(sock, 0) >= self.max_requests:
+            self._stats.expired += 1
+            self._close_socket(sock)
+            self._semaphore.release()
+            if self.min_idle:
+                self._keep_min_idle()
             return
+        if sock.gettimeout() != self.network_timeout:
+            # restore it after a request with its own network timeout
+            sock.settimeout(self.network_timeout)
+        if self.alive_check_grace or self.idle_timeout is not None:
+            self._returned_at[sock] = time.monotonic()
         self._socket_queue.put(sock)
         self._semaphore.release()
 
     def release_socket(self, sock):
         """call when the socket is no more usable."""
-        try:
-            sock.close()
-        except:  # noqa
-            pass
+        self._close_socket(sock)
         if not self._closed:
+            self._stats.discarded += 1
             self._semaphore.release()
+            if self.min_idle:
+                self._keep_min_idle()
 
 
 try:
@@ -0,0 +1,132 @@
+"""
+Future-like results of requests running in their own greenlet, for
+scatter/gather calls without spawning and joining greenlets by hand.
+
+    futures = [client.request_async("GET", uri) for uri in uris]
+    for future in as_completed(futures, timeout=5):
+        ...
+    responses = gather(futures)
+"""
+
+from concurrent.futures import CancelledError
+
+import gevent
+import gevent.event
+
+
+class RequestFuture:
+    """The eventual result of func(*args, **kw), which runs in a new
+    greenlet. Backed by a gevent AsyncResult, so it can be passed to
+    gevent.wait() and gevent.iwait() via async_result.
+    """
+
+    def __init__(self, func, *args, **kw):
+        self.async_result = gevent.event.AsyncResult()
+        self._greenlet = gevent.spawn(func, *args, **kw)
+        self._greenlet.link(self._on_greenlet_done)
+
+    def _on_greenlet_done(self, greenlet):
+        if self.async_result.ready():
+            # cancelled, but the request might have finished before
+            if greenlet.successful() and hasattr(greenlet.value, "release"):
+                greenlet.value.release()
+            return
+        if greenlet.successful():
+            self.async_result.set(greenlet.value)
+        else:
+            self.async_result.set_exception(greenlet.exception, greenlet.exc_info)
+
+    def cancel(self):
+        """Kill the request, unless it is done already. Returns whether it
+        got cancelled.
+        """
+        if self.async_result.ready():
+            return False
+        self.async_result.set_exception(CancelledError())
+        self._greenlet.kill(block=False)
+        return True
+
+    def cancelled(self):
+        return isinstance(self.async_result.exception, CancelledError)
+
+    def done(self):
+        return self.async_result.ready()
+
+    def wait(self, timeout=None):
+        """Block until done, at most timeout seconds. Returns done()."""
+        self.async_result.wait(timeout)
+        return self.done()
+
+    def result(self, timeout=None):
+        """Return the result or raise the exception of the request. Raises
+        gevent.Timeout if it isn't done after timeout seconds.
+        """
+        return self.async_result.get(timeout=timeout)
+
+    def exception(self, timeout=None):
+        """Return the exception of the request, None if it succeeded."""
+        if not self.wait(timeout):
+            raise gevent.Timeout(timeout)
+        return self.async_result.exception
+
+    def add_done_callback(self, callback):
+        """Call callback(future) once done, soon if it is already. It runs
+        in the hub and must not block.
+        """
+        self.async_result.rawlink(lambda _: callback(self))
+
+    def then(self, func):
+        """Return a new future for func(result), e.g. parsing the body.
+        Exceptions and cancellation of this future propagate.
+        """
+        return RequestFuture(lambda: func(self.result()))
+
+    def __repr__(self):
+        if not self.done():
+            state = "pending"
+        elif self.cancelled():
+            state = "cancelled"
+        elif self.async_result.successful():
+            state = "done"
+        else:
+            state = "failed"
+        return f"<{self.__class__.__name__} {state}>"
+
+
+def as_completed(futures, timeout=None):
+    """Yield the futures in the order they complete. Raises gevent.Timeout if
+    not all of them are done within timeout seconds.
+    """
+    futures = list(futures)
+    by_result = {id(future.async_result): future for future in futures}
+    count = 0
+    with gevent.iwait([future.async_result for future in futures], timeout) as results:
+        for async_result in results:
+            count += 1
+            yield by_result[id(async_result)]
+    if count < len(futures):
+        raise gevent.Timeout(timeout)
+
+
+def gather(futures, return_exceptions=False, timeout=None):
+    """Wait for all futures and return their results in the given order.
+
+    The first exception is raised as soon as it occurs, unless
+    return_exceptions is set, which returns exceptions in place of results.
+    When an exception or gevent.Timeout is raised, the futures not done yet
+    are cancelled, which releases their connections.
+    """
+    futures = list(futures)
+    try:
+        for future in as_completed(futures, timeout):
+            if not return_exceptions:
+                future.result()
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    results = []
+    for future in futures:
+        exception = future.exception()
+        results.append(future.result() if exception is None else exception)
+    return results
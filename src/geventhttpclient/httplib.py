@@ -75,21 +75,12 @@ class HTTPResponse(response.HTTPSocketResponse):
     def flush(self):
         self._body_buffer.clear()
 
-    def readable(self):
-        return True
-
-    def close(self):
-        self.release()
-
     def isclosed(self):
         return self._sock is None
 
     def read(self, amt=None):
         return super().read(amt)
 
-    def readinto(self, b):
-        raise NotImplementedError()
-
     def read1(self, n=-1):
         raise NotImplementedError()
 
@@ -0,0 +1,687 @@
+"""
+Response parser backends.
+
+All backends implement the interface of the compiled
+``geventhttpclient._parser.HTTPResponseParser``:
+
+- ``feed(data)`` parses a str or bytes-like object, an empty one signals
+  the end of the connection. Parse errors raise ``HTTPParseError``,
+  exceptions raised by callbacks are propagated unchanged.
+- ``get_code()``, ``get_http_version()``, ``get_remaining_content_length()``,
+  ``should_keep_alive()``, ``parser_failed()`` and ``reset()``.
+- the ``zero_copy_body`` flag.
+
+and call these methods of the (sub)class, if defined:
+
+- ``_on_message_begin()``
+- ``_on_status(reason)``
+- ``_on_headers(headers)`` with a list of (field, value) tuples, once
+  before ``_on_headers_complete`` and once more for chunked trailers
+- ``_on_headers_complete()``, a true return value skips the body
+- ``_on_body(data)``
+- ``_on_message_complete()``
+
+Callbacks are looked up once, on the first call of ``feed()``.
+
+The backend used by ``geventhttpclient.response.HTTPResponse`` is picked
+at import time from the ``GEVENTHTTPCLIENT_PARSER`` environment variable:
+``c`` (the default), ``python`` or ``httptools``. Without the compiled
+extension, e.g. on PyPy, the pure Python parser is used by default.
+"""
+
+import os
+import weakref
+from http.client import HTTPException
+from types import MethodType
+
+try:
+    from geventhttpclient._parser import HTTPParseError
+    from geventhttpclient._parser import HTTPResponseParser as CHTTPResponseParser
+except ImportError:
+    CHTTPResponseParser = None
+
+    class HTTPParseError(HTTPException):
+        pass
+
+
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
+
+# error numbers as used by llhttp, so all backends report the same ones
+HPE_INTERNAL = 1
+HPE_LF_EXPECTED = 3
+HPE_UNEXPECTED_CONTENT_LENGTH = 4
+HPE_CLOSED_CONNECTION = 5
+HPE_INVALID_VERSION = 9
+HPE_INVALID_HEADER_TOKEN = 10
+HPE_INVALID_CONTENT_LENGTH = 11
+HPE_INVALID_CHUNK_SIZE = 12
+HPE_INVALID_STATUS = 13
+HPE_INVALID_EOF_STATE = 14
+HPE_USER = 24
+
+_CALLBACKS = (
+    "_on_message_begin",
+    "_on_status",
+    "_on_headers",
+    "_on_headers_complete",
+    "_on_body",
+    "_on_message_complete",
+)
+
+_TOKEN = frozenset(b"!#$%&'*+-.^_`|~0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_HEX = frozenset(b"0123456789abcdefABCDEF")
+
+
+def _feed_bytes(data):
+    """Return the data passed to feed() as bytes."""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    try:
+        view = memoryview(data)
+    except TypeError:
+        raise TypeError(
+            f"feed() argument must be str or a bytes-like object, not '{type(data).__name__}'"
+        ) from None
+    if not view.c_contiguous:
+        raise BufferError("memoryview: underlying buffer is not C-contiguous")
+    return view.tobytes()
+
+
+def _call_without_self(callback):
+    """Wrap a callback set on the instance, to be called like a method."""
+
+    def call(self, *args):
+        return callback(*args)
+
+    return call
+
+
+class _CallbacksMixin:
+    def _bind_callbacks(self):
+        # Like the C parser, keep the functions of methods and pass self.
+        # Bound methods stored on the instance would make a reference
+        # cycle, which only the cyclic GC frees, and responses return their
+        # connection to the pool when they are freed.
+        for name in _CALLBACKS:
+            callback = getattr(self, name, None)
+            if callback is not None:
+                if isinstance(callback, MethodType) and callback.__self__ is self:
+                    callback = callback.__func__
+                else:
+                    callback = _call_without_self(callback)
+            setattr(self, "_cb" + name, callback)
+        self._callbacks_bound = True
+
+
+# parser states
+_START = 0  # before the first byte of a message
+_STATUS = 1
+_HEADERS = 2
+_BODY_LENGTH = 3
+_BODY_EOF = 4
+_CHUNK_SIZE = 5
+_CHUNK_DATA = 6
+_CHUNK_DATA_END = 7
+_TRAILERS = 8
+_CLOSED = 9  # after a message without keep-alive
+
+
+class PyHTTPResponseParser(_CallbacksMixin):
+    """HTTP response parser in pure Python, with the same behavior as the
+    llhttp based parser for the subset of HTTP/1.x the client relies on.
+    """
+
+    def __init__(self):
+        self.zero_copy_body = False
+        self._callbacks_bound = False
+        self._reset_parser()
+
+    def reset(self):
+        self._reset_parser()
+
+    def _reset_parser(self):
+        # not reset() itself, which subclasses extend
+        self._state = _START
+        self._line = bytearray()
+        self._error = 0
+        self._reason = None
+        self._status_code = 0
+        self._http_major = 0
+        self._http_minor = 0
+        self._headers = []
+        self._reset_message()
+
+    def _reset_message(self):
+        self._content_length = None
+        self._remaining = 0
+        self._chunked = False
+        self._transfer_encoding = False
+        self._connection_close = False
+        self._connection_keep_alive = False
+        self._skip_body = False
+        self._keep_alive = None
+
+    def _fail(self, errno, reason):
+        self._error = errno
+        self._reason = reason
+        raise HTTPParseError(reason, errno)
+
+    def _message_needs_eof(self):
+        status_code = self._status_code
+        if status_code // 100 == 1 or status_code in (204, 304) or self._skip_body:
+            return False
+        if self._transfer_encoding and not self._chunked:
+            return True
+        return not (self._chunked or self._content_length is not None)
+
+    def _should_keep_alive(self):
+        if self._http_major > 0 and self._http_minor > 0:
+            if self._connection_close:
+                return False
+        elif not self._connection_keep_alive:
+            return False
+        return not self._message_needs_eof()
+
+    def feed(self, data):
+        data = _feed_bytes(data)
+        if not self._callbacks_bound:
+            self._bind_callbacks()
+        if self._error:
+            raise HTTPParseError(self._reason, self._error)
+
+        if not data:
+            if not self._message_needs_eof():
+                raise HTTPParseError("Incomplete response.")
+            if self._state == _BODY_EOF:
+                self._run(self._message_complete)
+            elif self._state not in (_START, _CLOSED) or self._line:
+                self._fail(HPE_INVALID_EOF_STATE, "Invalid EOF state")
+            return
+
+        self._run(self._execute, data)
+
+    def _run(self, func, *args):
+        try:
+            func(*args)
+        except HTTPParseError:
+            if not self._error:
+                self._error = HPE_USER
+                self._reason = "Callback error"
+            raise
+        except BaseException:
+            # exception raised by a callback
+            self._error = HPE_USER
+            self._reason = "Callback error"
+            raise
+
+    def _callback(self, callback, *args):
+        if callback is not None and callback(self, *args):
+            self._fail(HPE_USER, "Callback error")
+
+    def _execute(self, data):
+        view = memoryview(data)
+        position = 0
+        end = len(data)
+        while position < end:
+            state = self._state
+            if state == _BODY_LENGTH or state == _CHUNK_DATA:
+                length = min(self._remaining, end - position)
+                self._body(view[position : position + length])
+                position += length
+                self._remaining -= length
+                if not self._remaining:
+                    if state == _BODY_LENGTH:
+                        self._message_complete()
+                    else:
+                        self._state = _CHUNK_DATA_END
+            elif state == _BODY_EOF:
+                self._body(view[position:])
+                position = end
+            elif state == _START or state == _CLOSED:
+                char = data[position]
+                if char == 0x0D or char == 0x0A:
+                    # empty lines in between messages are ignored
+                    position += 1
+                    continue
+                if state == _CLOSED:
+                    self._fail(HPE_CLOSED_CONNECTION, "Data after `Connection: close`")
+                self._reset_message()
+                self._status_code = 0
+                self._state = _STATUS
+                self._callback(self._cb_on_message_begin)
+            else:
+                newline = data.find(b"\n", position)
+                if newline < 0:
+                    self._line += view[position:]
+                    return
+                if self._line:
+                    self._line += view[position:newline]
+                    line = bytes(self._line)
+                    self._line.clear()
+                else:
+                    line = data[position:newline]
+                position = newline + 1
+                if line.endswith(b"\r"):
+                    line = line[:-1]
+                self._on_line(line)
+
+    def _body(self, data):
+        callback = self._cb_on_body
+        if callback is None or not len(data):
+            return
+        if not self.zero_copy_body:
+            self._callback(callback, bytearray(data))
+            return
+        try:
+            self._callback(callback, data)
+        finally:
+            # the view must not outlive the data passed to feed()
+            data.release()
+
+    def _on_line(self, line):
+        state = self._state
+        if state == _HEADERS or state == _TRAILERS:
+            if line:
+                self._parse_header(line)
+            elif state == _HEADERS:
+                self._headers_complete()
+            else:
+                self._message_complete()
+        elif state == _STATUS:
+            self._parse_status(line)
+        elif state == _CHUNK_SIZE:
+            self._parse_chunk_size(line)
+        elif state == _CHUNK_DATA_END:
+            if line:
+                self._fail(HPE_LF_EXPECTED, "Expected LF after chunk data")
+            self._state = _CHUNK_SIZE
+
+    def _parse_status(self, line):
+        if not line.startswith(b"HTTP/"):
+            self._fail(HPE_INVALID_VERSION, "Expected HTTP/")
+        version, _, rest = line[5:].partition(b" ")
+        if len(version) != 3 or version[1:2] != b"." or not version[::2].isdigit():
+            self._fail(HPE_INVALID_VERSION, "Invalid HTTP version")
+        self._http_major = version[0] - 0x30
+        self._http_minor = version[2] - 0x30
+        code, _, reason = rest.partition(b" ")
+        if len(code) != 3 or not code.isdigit():
+            self._fail(HPE_INVALID_STATUS, "Invalid response status")
+        self._status_code = int(code)
+        self._state = _HEADERS
+        if reason:
+            self._callback(self._cb_on_status, reason.decode())
+
+    def _parse_header(self, line):
+        field, colon, value = line.partition(b":")
+        if not colon or not field or not _TOKEN.issuperset(field):
+            self._fail(HPE_INVALID_HEADER_TOKEN, "Invalid header token")
+        value = value.strip(b" \t")
+        if self._state == _HEADERS:
+            self._parse_special_header(field.lower(), value)
+        self._headers.append((field.decode(), value.decode()))
+
+    def _parse_special_header(self, field, value):
+        if field == b"content-length":
+            if not value.isdigit():
+                self._fail(HPE_INVALID_CONTENT_LENGTH, "Invalid character in Content-Length")
+            if self._content_length is not None:
+                self._fail(HPE_UNEXPECTED_CONTENT_LENGTH, "Duplicate Content-Length")
+            self._content_length = int(value)
+        elif field == b"transfer-encoding":
+            self._transfer_encoding = True
+            self._chunked = value.rsplit(b",", 1)[-1].strip(b" \t").lower() == b"chunked"
+        elif field == b"connection":
+            for token in value.lower().split(b","):
+                token = token.strip(b" \t")
+                if token == b"close":
+                    self._connection_close = True
+                elif token == b"keep-alive":
+                    self._connection_keep_alive = True
+
+    def _flush_headers(self):
+        headers = self._headers
+        if headers:
+            self._headers = []
+            self._callback(self._cb_on_headers, headers)
+
+    def _headers_complete(self):
+        if self._chunked and self._content_length is not None:
+            self._fail(
+                HPE_UNEXPECTED_CONTENT_LENGTH,
+                "Content-Length can't be present with chunked encoding",
+            )
+        self._flush_headers()
+        callback = self._cb_on_headers_complete
+        if callback is not None and callback(self):
+            self._skip_body = True
+
+        # same order as llhttp__after_headers_complete
+        if self._skip_body:
+            self._message_complete()
+        elif self._chunked:
+            self._state = _CHUNK_SIZE
+        elif self._transfer_encoding:
+            self._state = _BODY_EOF
+        elif self._content_length is None:
+            if self._message_needs_eof():
+                self._state = _BODY_EOF
+            else:
+                self._message_complete()
+        elif self._content_length == 0:
+            self._message_complete()
+        else:
+            self._remaining = self._content_length
+            self._state = _BODY_LENGTH
+
+    def _parse_chunk_size(self, line):
+        size = line.split(b";", 1)[0].strip(b" \t")
+        if not size or not _HEX.issuperset(size):
+            self._fail(HPE_INVALID_CHUNK_SIZE, "Invalid character in chunk size")
+        self._remaining = int(size, 16)
+        self._state = _CHUNK_DATA if self._remaining else _TRAILERS
+
+    def _message_complete(self):
+        self._keep_alive = self._should_keep_alive()
+        self._state = _START if self._keep_alive else _CLOSED
+        # trailers of a chunked response
+        self._flush_headers()
+        self._callback(self._cb_on_message_complete)
+
+    def get_code(self):
+        return self._status_code
+
+    def get_http_version(self):
+        return f"HTTP/{self._http_major}.{self._http_minor}"
+
+    def get_remaining_content_length(self):
+        return self._remaining
+
+    def should_keep_alive(self):
+        if self._error:
+            return False
+        if self._keep_alive is not None:
+            return self._keep_alive
+        return self._should_keep_alive()
+
+    def parser_failed(self):
+        return bool(self._error)
+
+
+class _SkipBody(Exception):
+    pass
+
+
+def _header_ends(tail, data):
+    """Offsets in data right after each blank line, which might end the
+    headers. tail are the last bytes fed before data."""
+    ends = []
+    if tail:
+        found = (tail + data[:3]).find(b"\r\n\r\n")
+        if found >= 0:
+            ends.append(found + 4 - len(tail))
+    found = data.find(b"\r\n\r\n")
+    while found >= 0:
+        if not ends or found + 4 > ends[-1]:
+            ends.append(found + 4)
+        found = data.find(b"\r\n\r\n", found + 1)
+    return ends
+
+
+class _HttptoolsProtocol:
+    """Receives the httptools callbacks and translates them. httptools
+    replaces exceptions raised here with a HttpParserCallbackError, so
+    they are recorded on the parser to be raised again from feed().
+    """
+
+    __slots__ = ("parser",)
+
+    def __init__(self, parser):
+        # the parser holds the httptools parser, which holds this protocol
+        self.parser = weakref.proxy(parser)
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except BaseException as e:
+            self.parser._callback_error = e
+            raise
+
+    def on_message_begin(self):
+        self._call(self.parser._httptools_message_begin)
+
+    def on_status(self, status):
+        self._call(self.parser._httptools_status, status)
+
+    def on_header(self, field, value):
+        self._call(self.parser._httptools_header, field, value)
+
+    def on_headers_complete(self):
+        self._call(self.parser._httptools_headers_complete)
+
+    def on_body(self, body):
+        self._call(self.parser._httptools_body, body)
+
+    def on_message_complete(self):
+        self._call(self.parser._httptools_message_complete)
+
+
+class HttptoolsHTTPResponseParser(_CallbacksMixin):
+    """Adapter for the httptools response parser.
+
+    httptools ignores the return value of ``on_headers_complete``. To skip
+    the body (e.g. for HEAD requests) the data is fed in pieces ending at
+    blank lines. Parsing is aborted at the end of the headers and continues
+    with a new httptools parser from the next piece. Error messages and some
+    edge cases follow the llhttp version bundled with httptools.
+    """
+
+    def __init__(self):
+        if httptools is None:
+            raise ImportError("httptools is not installed")
+        self.zero_copy_body = False
+        self._callbacks_bound = False
+        self._reset_parser()
+
+    def reset(self):
+        self._reset_parser()
+
+    def _reset_parser(self):
+        # not reset() itself, which subclasses extend
+        self._parser = httptools.HttpResponseParser(_HttptoolsProtocol(self))
+        # end of the previously fed data, to find the end of the headers
+        self._tail = b""
+        self._error = 0
+        self._reason = None
+        self._headers = []
+        self._reset_message()
+
+    def _reset_message(self):
+        # kept from the headers, after a skipped body the parser is replaced
+        self._status_code = 0
+        self._http_version = None
+        self._message_complete = False
+        self._body_until_eof = False
+        self._keep_alive = None
+        self._remaining = 0
+
+    def feed(self, data):
+        data = _feed_bytes(data)
+        if not self._callbacks_bound:
+            self._bind_callbacks()
+        if self._error:
+            raise HTTPParseError(self._reason, self._error)
+
+        if not data:
+            if not self._body_until_eof or self._message_complete:
+                raise HTTPParseError("Incomplete response.")
+            self._run(self._httptools_message_complete, False)
+            return
+
+        tail = self._tail
+        self._tail = (tail + data[-3:])[-3:]
+        ends = _header_ends(tail, data)
+        if not ends:
+            self._feed_piece(data)
+            return
+        # the headers end at the end of a piece, so after a skipped body
+        # the next piece starts with the data following the headers
+        view = memoryview(data)
+        start = 0
+        for end in ends + [len(data)]:
+            if end > start:
+                self._feed_piece(view[start:end])
+                start = end
+
+    def _feed_piece(self, data):
+        self._callback_error = None
+        try:
+            self._parser.feed_data(data)
+        except httptools.HttpParserCallbackError:
+            exception = self._callback_error
+            self._callback_error = None
+            if not isinstance(exception, _SkipBody):
+                self._error = HPE_USER
+                self._reason = "Callback error"
+                raise exception from None
+        except httptools.HttpParserError as e:
+            self._error = HPE_INTERNAL
+            self._reason = str(e)
+            raise HTTPParseError(self._reason, self._error) from None
+        else:
+            return
+        # outside of the except clause, which would become the context of
+        # any exception raised while parsing the rest
+        self._parser = httptools.HttpResponseParser(_HttptoolsProtocol(self))
+        self._run(self._httptools_message_complete, exception.args[0])
+
+    def _run(self, func, *args):
+        try:
+            func(*args)
+        except BaseException:
+            self._error = HPE_USER
+            self._reason = "Callback error"
+            raise
+
+    def _call(self, callback, *args):
+        if callback is not None and callback(self, *args):
+            raise HTTPParseError("Callback error", HPE_USER)
+
+    def _httptools_message_begin(self):
+        self._reset_message()
+        self._call(self._cb_on_message_begin)
+
+    def _httptools_status(self, status):
+        self._call(self._cb_on_status, status.decode())
+
+    def _httptools_header(self, field, value):
+        self._headers.append((field.decode(), value.decode()))
+
+    def _flush_headers(self):
+        headers = self._headers
+        if headers:
+            self._headers = []
+            self._call(self._cb_on_headers, headers)
+
+    def _httptools_headers_complete(self):
+        self._status_code = self._parser.get_status_code()
+        self._http_version = self._parser.get_http_version()
+        content_length = None
+        chunked = False
+        keep_alive = self._parser.get_http_version() == "1.1"
+        for field, value in self._headers:
+            field = field.lower()
+            if field == "content-length":
+                content_length = int(value)
+            elif field == "transfer-encoding":
+                chunked = value.rsplit(",", 1)[-1].strip(" \t").lower() == "chunked"
+            elif field == "connection":
+                tokens = {token.strip(" \t") for token in value.lower().split(",")}
+                if "close" in tokens:
+                    keep_alive = False
+                elif "keep-alive" in tokens:
+                    keep_alive = True
+        self._flush_headers()
+
+        callback = self._cb_on_headers_complete
+        if callback is not None and callback(self):
+            raise _SkipBody(keep_alive)
+        status_code = self._status_code
+        has_body = not (status_code // 100 == 1 or status_code in (204, 304))
+        self._remaining = content_length or 0
+        self._body_until_eof = has_body and content_length is None and not chunked
+
+    def _httptools_body(self, body):
+        self._remaining = max(self._remaining - len(body), 0)
+        callback = self._cb_on_body
+        if callback is None:
+            return
+        if not self.zero_copy_body:
+            self._call(callback, bytearray(body))
+            return
+        view = memoryview(body)
+        try:
+            self._call(callback, view)
+        finally:
+            view.release()
+
+    def _httptools_message_complete(self, keep_alive=None):
+        if keep_alive is None:
+            keep_alive = self._parser.should_keep_alive()
+        self._keep_alive = keep_alive
+        self._message_complete = True
+        # trailers of a chunked response
+        self._flush_headers()
+        self._call(self._cb_on_message_complete)
+
+    def get_code(self):
+        return self._status_code or self._parser.get_status_code()
+
+    def get_http_version(self):
+        return "HTTP/" + (self._http_version or self._parser.get_http_version())
+
+    def get_remaining_content_length(self):
+        return self._remaining
+
+    def should_keep_alive(self):
+        if self._error:
+            return False
+        if self._keep_alive is not None:
+            return self._keep_alive
+        return self._parser.should_keep_alive()
+
+    def parser_failed(self):
+        return bool(self._error)
+
+
+PARSERS = {
+    "c": CHTTPResponseParser,
+    "python": PyHTTPResponseParser,
+    "httptools": HttptoolsHTTPResponseParser if httptools is not None else None,
+}
+
+
+def get_parser_class(name=None):
+    """Return the parser backend called name, by default the one selected
+    by the GEVENTHTTPCLIENT_PARSER environment variable.
+    """
+    if name is None:
+        name = os.environ.get("GEVENTHTTPCLIENT_PARSER")
+        if not name:
+            return CHTTPResponseParser or PyHTTPResponseParser
+    try:
+        parser_class = PARSERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown parser {name!r}, expected one of {', '.join(PARSERS)}") from None
+    if parser_class is None:
+        raise ImportError(f"parser {name!r} is not available")
+    return parser_class
+
+
+HTTPResponseParser = get_parser_class()
@@ -176,9 +176,11 @@ class Session(useragent.UserAgent):
             for multipart encoding upload.
         :param auth: (optional) Auth tuple or callable to enable
             Basic/Digest/Custom HTTP Auth.
-        :param timeout: (optional) How long to wait for the server to send
-            data before giving up, as a float, or a :ref:`(connect timeout,
-            read timeout) <timeouts>` tuple.
+        :param timeout: (optional) How many seconds the whole request may
+            take, including redirects, retries and with ``stream=False``
+            reading the body. Or a ``(connect timeout, read timeout)``
+            tuple, which replaces the timeouts of the UserAgent for this
+            request. None in the tuple keeps the one of the UserAgent.
         :type timeout: float or tuple
         :param allow_redirects: (optional) Set to True by default.
         :type allow_redirects: bool
@@ -198,7 +200,11 @@ class Session(useragent.UserAgent):
             If Tuple, ('cert', 'key') pair.
         :rtype: CompatResponse
         """
-        for param_name, param in dict(timeout=timeout, cert=cert, verify=verify).items():
+        connection_timeout = network_timeout = None
+        if isinstance(timeout, tuple):
+            connection_timeout, network_timeout = timeout
+            timeout = None
+        for param_name, param in dict(cert=cert, verify=verify).items():
             if param is not None:
                 raise ValueError(
                     f"{param} can not be set on a per-request basis. Please configure the UserAgent instead."
@@ -230,6 +236,9 @@ class Session(useragent.UserAgent):
             payload=data or None,
             params=params,
             max_redirects=None if allow_redirects else 0,
+            timeout=timeout,
+            connection_timeout=connection_timeout,
+            network_timeout=network_timeout,
         )
         if stream is False:
             # preload the data
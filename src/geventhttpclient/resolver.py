@@ -0,0 +1,127 @@
+"""
+Caching DNS resolution for connection pools. getaddrinfo() doesn't tell
+the TTL of a record, so results are kept for a fixed time.
+
+    client = HTTPClient(host, resolver=shared_resolver)
+
+The same resolver instance can be passed to any number of clients, e.g. as
+keyword argument of HTTPClientPool or UserAgent, to share its cache.
+"""
+
+import time
+
+import gevent
+import gevent.event
+import gevent.socket
+
+
+class CachingResolver:
+    """getaddrinfo() with a cache.
+
+    :param ttl: seconds a successful lookup is cached
+    :param negative_ttl: seconds a failed lookup (gaierror) is cached
+    :param stale_ttl: seconds an expired result is still served, while it
+        gets refreshed in the background. A failed refresh keeps it.
+    :param max_size: maximum number of cached lookups
+    :param getaddrinfo: function doing the actual lookups
+    """
+
+    def __init__(
+        self,
+        ttl=60.0,
+        negative_ttl=5.0,
+        stale_ttl=30.0,
+        max_size=1024,
+        getaddrinfo=gevent.socket.getaddrinfo,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self._getaddrinfo = getaddrinfo
+        # key -> (expires, result, error)
+        self._entries = {}
+        # key -> AsyncResult of the lookup in progress
+        self._pending = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, result, error = entry
+            now = time.monotonic()
+            if now < expires:
+                self.hits += 1
+                if error is not None:
+                    raise error.with_traceback(None)
+                return result
+            if error is None and now < expires + self.stale_ttl:
+                self.stale_hits += 1
+                if key not in self._pending:
+                    gevent.spawn(self._refresh, key)
+                return result
+        self.misses += 1
+        return self._resolve(key)
+
+    def _resolve(self, key, refresh=False):
+        """Look up key, or wait for the lookup already in progress."""
+        waiting = self._pending.get(key)
+        if waiting is None:
+            waiting = self._pending[key] = gevent.event.AsyncResult()
+            try:
+                waiting.set(self._lookup(key, refresh))
+            except BaseException as e:
+                waiting.set_exception(e)
+                raise
+            finally:
+                del self._pending[key]
+        result, error = waiting.get()
+        if error is not None:
+            raise error.with_traceback(None)
+        return result
+
+    def _lookup(self, key, refresh):
+        try:
+            result = self._getaddrinfo(*key)
+        except gevent.socket.gaierror as e:
+            self.errors += 1
+            if not refresh:
+                self._store(key, self.negative_ttl, None, e)
+            return None, e
+        self._store(key, self.ttl, result, None)
+        return result, None
+
+    def _refresh(self, key):
+        try:
+            self._resolve(key, refresh=True)
+        except Exception:
+            # served stale until it expires completely
+            pass
+
+    def _store(self, key, ttl, result, error):
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_size:
+            # drop the oldest lookup
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + ttl, result, error)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Snapshot of the cache metrics."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# process-wide instance, pass it as resolver to share it
+shared_resolver = CachingResolver()
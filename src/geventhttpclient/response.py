@@ -1,18 +1,163 @@
 import errno
+import time
+from collections import deque
+from contextlib import nullcontext
 
+import gevent
 import gevent.socket
 
-from geventhttpclient._parser import HTTPParseError, HTTPResponseParser
+from geventhttpclient.parser import HTTPParseError, HTTPResponseParser
 from geventhttpclient.header import Headers
 
-HEADER_STATE_INIT = 0
-HEADER_STATE_FIELD = 1
-HEADER_STATE_VALUE = 2
-HEADER_STATE_DONE = 3
 
+class BodyBuffer:
+    """FIFO buffer for received body data.
+
+    Chunks are kept as they were received, together with a read offset into
+    the first one. Consuming data from the front therefore never moves the
+    remaining bytes around, which keeps reading a large body in small pieces
+    linear.
+    """
+
+    __slots__ = ("_chunks", "_offset", "_length")
+
+    def __init__(self):
+        self._chunks = deque()
+        self._offset = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __bytes__(self):
+        return self._peek(self._length)
+
+    def append(self, data):
+        if not len(data):
+            return
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        self._chunks.append(data)
+        self._length += len(data)
+
+    def clear(self):
+        self._chunks.clear()
+        self._offset = 0
+        self._length = 0
+
+    def _peek(self, length):
+        parts = []
+        offset = self._offset
+        for chunk in self._chunks:
+            if length <= 0:
+                break
+            part = chunk[offset : offset + length] if offset or length < len(chunk) else chunk
+            parts.append(part)
+            length -= len(part)
+            offset = 0
+        return b"".join(parts)
 
-def copy(data):
-    return data[:]
+    def read(self, length=None):
+        """Remove and return up to length bytes, everything by default."""
+        if length is None or length >= self._length:
+            length = self._length
+        chunks = self._chunks
+        parts = []
+        remaining = length
+        while remaining:
+            chunk = chunks[0]
+            offset = self._offset
+            available = len(chunk) - offset
+            if available > remaining:
+                parts.append(chunk[offset : offset + remaining])
+                self._offset = offset + remaining
+                break
+            parts.append(chunk[offset:] if offset else chunk)
+            chunks.popleft()
+            self._offset = 0
+            remaining -= available
+        self._length -= length
+        return b"".join(parts)
+
+    def readinto(self, view):
+        """Move up to len(view) bytes into the writable memoryview view."""
+        length = min(len(view), self._length)
+        chunks = self._chunks
+        position = 0
+        while position < length:
+            chunk = chunks[0]
+            offset = self._offset
+            size = min(len(chunk) - offset, length - position)
+            view[position : position + size] = chunk[offset : offset + size]
+            position += size
+            if offset + size == len(chunk):
+                chunks.popleft()
+                self._offset = 0
+            else:
+                self._offset = offset + size
+        self._length -= length
+        return length
+
+    def skip(self, length):
+        """Discard up to length bytes from the front."""
+        length = min(length, self._length)
+        chunks = self._chunks
+        remaining = length
+        while remaining:
+            available = len(chunks[0]) - self._offset
+            if available > remaining:
+                self._offset += remaining
+                break
+            chunks.popleft()
+            self._offset = 0
+            remaining -= available
+        self._length -= length
+
+    def find(self, sub, start=0):
+        """Return the lowest index of sub at or after start, -1 if not found.
+
+        The chunk holding start is looked up from the closer end, so
+        repeatedly searching only newly received data stays cheap, no matter
+        how many chunks are buffered in front of it.
+        """
+        chunks = self._chunks
+        if start <= self._length // 2:
+            index = 0
+            position = 0
+            while index < len(chunks) - 1:
+                length = len(chunks[index]) - (self._offset if not index else 0)
+                if position + length > start:
+                    break
+                position += length
+                index += 1
+        else:
+            index = len(chunks)
+            position = self._length
+            while index and position > start:
+                index -= 1
+                position -= len(chunks[index])
+                if not index:
+                    position += self._offset
+
+        size = len(sub)
+        tail = b""
+        for index in range(index, len(chunks)):
+            chunk = chunks[index]
+            offset = self._offset if not index else 0
+            length = len(chunk) - offset
+            if tail:
+                # matches spanning the border to the previous chunk
+                window = tail + chunk[offset : offset + size - 1]
+                found = window.find(sub, max(start - position + len(tail), 0))
+                if found >= 0:
+                    return position - len(tail) + found
+            found = chunk.find(sub, offset + max(start - position, 0))
+            if found >= 0:
+                return position + found - offset
+            position += length
+            if size > 1:
+                tail = (tail + chunk[max(offset, len(chunk) - size + 1) :])[1 - size :]
+        return -1
 
 
 class HTTPConnectionClosed(HTTPParseError):
@@ -23,20 +168,55 @@ class HTTPProtocolViolationError(HTTPParseError):
     pass
 
 
+class HTTPLineTooLong(HTTPParseError):
+    pass
+
+
+class HTTPDeadlineExceeded(gevent.socket.timeout):
+    """The total time budget of a request ran out."""
+
+
+def _deadline_timer(deadline):
+    """Timeout raising HTTPDeadlineExceeded at deadline, a time.monotonic()
+    value. A no-op context for no deadline.
+    """
+    if deadline is None:
+        return nullcontext()
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise HTTPDeadlineExceeded("request deadline exceeded")
+    return gevent.Timeout(remaining, HTTPDeadlineExceeded("request deadline exceeded"))
+
+
 class HTTPResponse(HTTPResponseParser):
     def __init__(self, method="GET", headers_type=Headers):
         super().__init__()
+        self.zero_copy_body = True
         self.method = method.upper()
         self.headers_complete = False
         self.message_begun = False
         self.message_complete = False
         self._headers_index = headers_type()
-        self._header_state = HEADER_STATE_INIT
-        self._current_header_field = None
-        self._current_header_value = None
-        self._header_position = 1
-        self._body_buffer = bytearray()
+        self._body_buffer = BodyBuffer()
+        self.status_message = None
+        self._interim_status = None
+
+    def reset(self, method=None):
+        """Prepare for parsing the next response on the same connection.
+
+        Headers and body of the previous response are discarded. Reusing
+        one response object saves the allocations a new one would need.
+        """
+        super().reset()
+        if method is not None:
+            self.method = method.upper()
+        self.headers_complete = False
+        self.message_begun = False
+        self.message_complete = False
+        self._headers_index.clear()
+        self._body_buffer.clear()
         self.status_message = None
+        self._interim_status = None
 
     def __getitem__(self, key):
         return self._headers_index[key]
@@ -91,44 +271,40 @@ class HTTPResponse(HTTPResponseParser):
         self.message_begun = True
 
     def _on_message_complete(self):
-        self.message_complete = True
+        if self.headers_complete:
+            self.message_complete = True
+        else:
+            self._on_interim_complete()
+
+    def _on_interim_complete(self):
+        # an interim 1xx response like 100 Continue, the final one follows
+        # on the same connection
+        self._interim_status = self.get_code()
+        self.message_begun = False
+        self._headers_index.clear()
+        self.status_message = None
+
+    def _on_headers(self, headers):
+        # list of (field, value) tuples, collected by the parser. Called once
+        # before _on_headers_complete and once more for chunked trailers.
+        add = self._headers_index.add
+        for field, value in headers:
+            add(field, value)
 
     def _on_headers_complete(self):
-        self._flush_header()
-        self._header_state = HEADER_STATE_DONE
+        status_code = self.get_code()
+        if 100 <= status_code < 200 and status_code != 101:
+            return False
         self.headers_complete = True
 
         if self.method == "HEAD":
             return True  # SKIP BODY
         return False
 
-    def _on_header_field(self, string):
-        if self._header_state == HEADER_STATE_FIELD:
-            self._current_header_field += string
-        else:
-            if self._header_state == HEADER_STATE_VALUE:
-                self._flush_header()
-            self._current_header_field = string
-
-        self._header_state = HEADER_STATE_FIELD
-
-    def _on_header_value(self, string):
-        if self._header_state == HEADER_STATE_VALUE:
-            self._current_header_value += string
-        else:
-            self._current_header_value = string
-
-        self._header_state = HEADER_STATE_VALUE
-
-    def _flush_header(self):
-        if self._current_header_field is not None:
-            self._headers_index.add(self._current_header_field, self._current_header_value)
-            self._header_position += 1
-            self._current_header_field = None
-            self._current_header_value = None
-
     def _on_body(self, buf):
-        self._body_buffer += buf
+        # buf is a view into the data passed to feed(), released right
+        # after this callback, see zero_copy_body. BodyBuffer copies it.
+        self._body_buffer.append(buf)
 
     def __repr__(self):
         return f"<{self.__class__.__name__} status={self.status_code} headers={dict(self.headers)}>"
@@ -136,14 +312,51 @@ class HTTPResponse(HTTPResponseParser):
 
 class HTTPSocketResponse(HTTPResponse):
     DEFAULT_BLOCK_SIZE = 1024 * 4  # 4KB
+    # read(length) may grow the receive buffer up to this size
+    MAX_RECV_SIZE = 1024 * 256  # 256KB
 
     def __init__(
-        self, sock, block_size=DEFAULT_BLOCK_SIZE, method="GET", headers_type=Headers, **kw
+        self,
+        sock,
+        block_size=DEFAULT_BLOCK_SIZE,
+        method="GET",
+        headers_type=Headers,
+        continue_timeout=None,
+        deadline=None,
+        **kw,
     ):
         super().__init__(method=method, headers_type=headers_type)
         self._sock = sock
+        # time.monotonic() by which the whole body must be received
+        self._deadline = deadline
         self.block_size = block_size
-        self._read_headers()
+        self._recv_view = memoryview(self._get_recv_buffer())
+        self._readinto_view = None
+        self._readinto_length = 0
+        self._closed = False
+        # the request was sent with Expect: 100-continue and its body is
+        # still outstanding, see _read_headers
+        self._body_pending = continue_timeout is not None
+        self._read_headers(continue_timeout)
+
+    def _get_recv_buffer(self, size=None):
+        """Buffer to receive data into, before it gets fed to the parser."""
+        return bytearray(size or self.block_size)
+
+    def _recv(self, size=None):
+        """Receive one block from the socket and feed it to the parser. A
+        size beyond the block size grows the block, up to MAX_RECV_SIZE.
+        Returns the number of bytes received, 0 on EOF.
+        """
+        if size is not None and len(self._recv_view) < min(size, self.MAX_RECV_SIZE):
+            self._recv_view = memoryview(self._get_recv_buffer(min(size, self.MAX_RECV_SIZE)))
+        if self._deadline is None:
+            length = self._sock.recv_into(self._recv_view)
+        else:
+            with _deadline_timer(self._deadline):
+                length = self._sock.recv_into(self._recv_view)
+        self.feed(self._recv_view[:length])
+        return length
 
     def release(self):
         try:
@@ -158,15 +371,29 @@ class HTTPSocketResponse(HTTPResponse):
     def __del__(self):
         self.release()
 
-    def _read_headers(self):
+    def should_close(self):
+        # the server may still wait for a body that never got sent
+        return self._body_pending or super().should_close()
+
+    def _read_headers(self, continue_timeout=None):
+        """Receive until the headers of the final response are complete.
+
+        With continue_timeout, return early after an interim 100 Continue or
+        if the server remained silent for continue_timeout seconds. The
+        request body is sent then and this gets called once more.
+        """
+        timer = None
+        if continue_timeout is not None:
+            timer = gevent.Timeout.start_new(continue_timeout)
         try:
-            start = True
+            start = not self.message_begun and self._interim_status is None
             while not self.headers_complete:
+                if timer is not None and self._interim_status == 100:
+                    break
                 try:
-                    data = self._sock.recv(self.block_size)
-                    self.feed(data)
+                    length = self._recv()
                     # depending on gevent version we get a conn reset or no data
-                    if not len(data) and not self.headers_complete:
+                    if not length and not self.headers_complete:
                         if start:
                             raise HTTPConnectionClosed("connection closed.")
                         raise HTTPParseError("connection closed before end of the headers")
@@ -179,36 +406,67 @@ class HTTPSocketResponse(HTTPResponse):
 
             if self.message_complete:
                 self.release()
+        except gevent.Timeout as e:
+            if e is not timer:
+                self.release()
+                raise
         except BaseException:
             self.release()
             raise
+        finally:
+            if timer is not None:
+                timer.close()
+
+    def readline(self, sep=b"\r\n", max_length=None):
+        """Read up to and including the next occurrence of sep. At the end of
+        the body the remaining data is returned, b"" if there is none.
+
+        Raises HTTPLineTooLong if max_length bytes are buffered without
+        finding a complete line.
+        """
+        length, _ = self._find_line(sep, max_length)
+        return self._body_buffer.read(length)
 
-    def readline(self, sep=b"\r\n"):
-        cursor = 0
-        multibyte = len(sep) > 1
+    def iter_lines(self, sep=b"\n", max_length=None, keepends=False):
+        """Iterate over the lines of the body, e.g. of a stream of
+        line-delimited JSON documents.
+        """
+        buf = self._body_buffer
+        size = len(sep)
         while True:
-            cursor = self._body_buffer.find(sep[0:1], cursor)
-            if cursor >= 0:
-                found = True
-                if multibyte:
-                    pos = cursor
-                    cursor = self._body_buffer.find(sep, cursor)
-                    if cursor < 0:
-                        cursor = pos
-                        found = False
-                if found:
-                    length = cursor + len(sep)
-                    line = copy(self._body_buffer[:length])
-                    del self._body_buffer[:length]
-                    cursor = 0
-                    return line
+            length, complete = self._find_line(sep, max_length)
+            if not length:
+                return
+            if keepends or not complete:
+                yield buf.read(length)
             else:
-                cursor = 0
-            if self.message_complete:
-                return b""
+                line = buf.read(length - size)
+                buf.skip(size)
+                yield line
+
+    def _find_line(self, sep, max_length):
+        """Receive until a complete line is buffered and return its length
+        including sep, and whether sep was found at all. Bytes already
+        searched are not searched again.
+        """
+        buf = self._body_buffer
+        size = len(sep)
+        start = 0
+        while True:
+            cursor = buf.find(sep, start)
+            if cursor >= 0:
+                length = cursor + size
+                if max_length is not None and length > max_length:
+                    raise HTTPLineTooLong(f"line exceeds {max_length} bytes")
+                return length, True
+            if max_length is not None and len(buf) > max_length:
+                raise HTTPLineTooLong(f"line exceeds {max_length} bytes")
+            if self.message_complete or self._sock is None:
+                return len(buf), False
+            # a separator may still start within the last size - 1 bytes
+            start = max(len(buf) - size + 1, 0)
             try:
-                data = self._sock.recv(self.block_size)
-                self.feed(data)
+                self._recv()
             except BaseException:
                 self.release()
                 raise
@@ -217,31 +475,84 @@ class HTTPSocketResponse(HTTPResponse):
         # get the existing body that may have already been parsed
         # during headers parsing
         if length is not None and len(self._body_buffer) >= length:
-            read = self._body_buffer[0:length]
-            del self._body_buffer[0:length]
-            return copy(read)
+            return self._body_buffer.read(length)
 
         if self._sock is None:
-            read = copy(self._body_buffer)
-            del self._body_buffer[:]
-            return read
+            return self._body_buffer.read()
 
         try:
-            while not self.message_complete and (length is None or len(self._body_buffer) < length):
-                data = self._sock.recv(length or self.block_size)
-                self.feed(data)
+            if length is None:
+                while not self.message_complete:
+                    self._recv()
+            else:
+                while not self.message_complete and len(self._body_buffer) < length:
+                    self._recv(length - len(self._body_buffer))
         except:
             self.release()
             raise
 
-        if length is not None:
-            read = copy(self._body_buffer[0:length])
-            del self._body_buffer[0:length]
-            return read
+        return self._body_buffer.read(length)
 
-        read = copy(self._body_buffer)
-        del self._body_buffer[:]
-        return read
+    def preload(self):
+        """Receive the complete body into memory and release the connection.
+        Reading the response doesn't block afterwards.
+        """
+        try:
+            while not self.message_complete and self._sock is not None:
+                self._recv()
+        except:
+            self.release()
+            raise
+
+    def readinto(self, b):
+        """Read body data into the writable buffer b and return the number of
+        bytes read, 0 at the end of the body. Data not already buffered is
+        passed by the parser straight into b.
+        """
+        view = memoryview(b).cast("B")
+        if not len(view):
+            return 0
+
+        if len(self._body_buffer):
+            return self._body_buffer.readinto(view)
+
+        if self._sock is None:
+            return 0
+
+        self._readinto_view = view
+        self._readinto_length = 0
+        try:
+            while not self._readinto_length and not self.message_complete:
+                self._recv()
+        except:
+            self.release()
+            raise
+        finally:
+            self._readinto_view = None
+        return self._readinto_length
+
+    def _on_body(self, buf):
+        view = self._readinto_view
+        if view is None:
+            self._body_buffer.append(buf)
+            return
+        start = self._readinto_length
+        length = min(len(view) - start, len(buf))
+        view[start : start + length] = buf[:length]
+        self._readinto_length = start + length
+        if length < len(buf):
+            self._body_buffer.append(buf[length:])
+
+    def readable(self):
+        return True
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        self._closed = True
+        self.release()
 
     def __iter__(self):
         return self
@@ -254,7 +565,8 @@ class HTTPSocketResponse(HTTPResponse):
 
     def _on_message_complete(self):
         super()._on_message_complete()
-        self.release()
+        if self.message_complete:
+            self.release()
 
     def __enter__(self):
         return self
@@ -268,6 +580,10 @@ class HTTPSocketPoolResponse(HTTPSocketResponse):
         self._pool = pool
         super().__init__(sock, **kw)
 
+    def _get_recv_buffer(self, size=None):
+        # reused by all responses on the same keep-alive connection
+        return self._pool.get_recv_buffer(self._sock, size or self.block_size)
+
     def release(self):
         try:
             if self._sock is not None:
@@ -282,3 +598,92 @@ class HTTPSocketPoolResponse(HTTPSocketResponse):
     def __del__(self):
         if self._sock is not None:
             self._pool.release_socket(self._sock)
+
+
+class HTTPPipelinedResponse(HTTPResponse):
+    """Response to a pipelined request. It gets parsed by the
+    HTTPPipelineParser of the connection and holds the complete body.
+    """
+
+    def __init__(self, method="GET", headers_type=Headers):
+        super().__init__(method=method, headers_type=headers_type)
+        self._status_code = 0
+        self._http_version = None
+        self._keep_alive = False
+
+    def get_code(self):
+        return self._status_code
+
+    def get_http_version(self):
+        return self._http_version
+
+    def should_keep_alive(self):
+        return self._keep_alive
+
+    def should_close(self):
+        return not self.message_complete or not self._keep_alive
+
+    def read(self, length=None):
+        return self._body_buffer.read(length)
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class HTTPPipelineParser(HTTPResponseParser):
+    """Parses the responses to pipelined requests, arriving back to back on
+    one connection. Every response is passed on to the next expected
+    HTTPPipelinedResponse, complete ones are collected in responses.
+    """
+
+    def __init__(self, headers_type=Headers):
+        super().__init__()
+        self.zero_copy_body = True
+        self.headers_type = headers_type
+        self.responses = deque()
+        # the last complete response announced the end of the connection
+        self.closing = False
+        self._expected = deque()
+        self._current = None
+
+    def expect(self, method):
+        """Register a request sent on the connection."""
+        self._expected.append(HTTPPipelinedResponse(method, headers_type=self.headers_type))
+
+    def _on_message_begin(self):
+        # still set if an interim 1xx response preceded
+        if self._current is None:
+            if not self._expected:
+                raise HTTPProtocolViolationError("Received a response without a request.")
+            self._current = self._expected.popleft()
+        self._current._on_message_begin()
+
+    def _on_status(self, msg):
+        self._current._on_status(msg)
+
+    def _on_headers(self, headers):
+        self._current._on_headers(headers)
+
+    def _on_headers_complete(self):
+        current = self._current
+        current._status_code = self.get_code()
+        current._http_version = self.get_http_version()
+        return current._on_headers_complete()
+
+    def _on_body(self, buf):
+        self._current._on_body(buf)
+
+    def _on_message_complete(self):
+        current = self._current
+        current._on_message_complete()
+        if current.message_complete:
+            current._keep_alive = self.should_keep_alive()
+            self.closing = not current._keep_alive
+            self._current = None
+            self.responses.append(current)
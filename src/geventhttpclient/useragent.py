@@ -4,6 +4,7 @@ import os
 import socket
 import ssl
 import sys
+import time
 import zlib
 from urllib.parse import urlencode
 
@@ -12,7 +13,9 @@ import gevent
 from urllib3 import encode_multipart_formdata
 from urllib3.fields import RequestField
 
-from geventhttpclient.client import HTTPClient, HTTPClientPool
+from geventhttpclient.client import HTTPClient, HTTPClientPool, _is_body_stream
+from geventhttpclient.futures import RequestFuture
+from geventhttpclient.response import HTTPDeadlineExceeded
 from geventhttpclient.url import URL, to_key_val_list
 
 
@@ -71,6 +74,11 @@ class CompatRequest:
         self.method = method.upper()
         self.headers = headers
         self.payload = payload
+        # seconds left for the next attempt, set by UserAgent.urlopen
+        self.timeout = None
+        # per-request overrides of the HTTPClient timeouts
+        self.connection_timeout = None
+        self.network_timeout = None
 
     @property
     def full_url(self):
@@ -129,6 +137,8 @@ class CompatRequest:
 
     def redirect(self, code, location):
         """Modify the request inplace to point to the new location"""
+        if code not in (302, 303) and _is_body_stream(self.payload):
+            raise ValueError(f"Can't repeat the streamed payload for a {code} redirect")
         self.set_url(self.url_split.redirect(location))
         if code in (302, 303):
             self._drop_payload()
@@ -350,9 +360,20 @@ class UserAgent:
         max_retries=None,
         max_redirects=None,
         files=None,
+        timeout=None,
+        connection_timeout=None,
+        network_timeout=None,
         **kw,
     ):
-        """Open a URL, do retries and redirects and verify the status code"""
+        """Open a URL, do retries and redirects and verify the status code
+
+        The timeout in seconds is a deadline for everything, all retries and
+        redirects including reading the final response. HTTPDeadlineExceeded
+        is raised once it passed, it's not retried.
+
+        connection_timeout and network_timeout override the ones of the
+        pooled clients for this request only.
+        """
         # POST or GET parameters can be passed in **kw
         req_headers = self.default_headers.copy()
         if headers:
@@ -377,20 +398,33 @@ class UserAgent:
             files=files,
             request_type=self.request_type,
         )
+        req.connection_timeout = connection_timeout
+        req.network_timeout = network_timeout
         max_retries = int(max_retries) if max_retries is not None else self.max_retries
+        if _is_body_stream(req.payload):
+            # an iterable payload is consumed by the first attempt
+            max_retries = 0
         max_redirects = int(max_redirects) if max_redirects is not None else self.max_redirects
+        deadline = None if timeout is None else time.monotonic() + timeout
 
         for retry in range(max_retries + 1):
             if retry > 0 and self.retry_delay:
                 # Don't wait the first time and skip if no delay specified
-                gevent.sleep(self.retry_delay)
+                delay = self.retry_delay
+                if deadline is not None:
+                    delay = min(delay, max(deadline - time.monotonic(), 0))
+                gevent.sleep(delay)
             for _ in range(max_redirects + 1):
                 if self.cookiejar is not None:
                     self.cookiejar.add_cookie_header(req)
+                if deadline is not None:
+                    req.timeout = deadline - time.monotonic()
+                    if req.timeout <= 0:
+                        raise HTTPDeadlineExceeded("request deadline exceeded")
 
                 try:
                     resp = self._urlopen(req)
-                except gevent.GreenletExit:
+                except (gevent.GreenletExit, HTTPDeadlineExceeded):
                     raise
                 except BaseException as e:
                     e.request = req
@@ -437,6 +471,8 @@ class UserAgent:
                     # bodies as error and continue retries automatically
                     try:
                         ret = resp.content
+                    except HTTPDeadlineExceeded:
+                        raise
                     except Exception as e:
                         last_error = self._handle_error(e, url=req.url)
                         break
@@ -453,6 +489,11 @@ class UserAgent:
         else:
             return self._handle_retries_exceeded(url, last_error=last_error)
 
+    def urlopen_async(self, url, **kw):
+        """Like urlopen(), but runs in a new greenlet and returns a
+        RequestFuture for the response right away."""
+        return RequestFuture(self.urlopen, url, **kw)
+
     def _urlopen(self, request):
         client = self.clientpool.get_client(request.url_split)
         resp = client.request(
@@ -460,13 +501,16 @@ class UserAgent:
             request.url_split.quoted_uri,
             body=request.payload,
             headers=request.headers,
+            timeout=request.timeout,
+            connection_timeout=request.connection_timeout,
+            network_timeout=request.network_timeout,
         )
         return self.response_type(resp, request=request, sent_request=resp._sent_request)
 
     @classmethod
     def _conversation_str(cls, url, resp, payload=None, encoding="utf-8"):
         header_str = "\n".join(f"{key}: {val}" for key, val in resp.headers.items())
-        ret = "REQUEST: " + url + "\n" + resp._sent_request
+        ret = "REQUEST: " + url + "\n" + resp._sent_request.decode()
         if payload:
             if isinstance(payload, bytes):
                 try:
@@ -1,3 +1,4 @@
+import socket
 from contextlib import contextmanager
 
 import gevent.pywsgi
@@ -53,6 +54,23 @@ def wsgiserver(handler):
         server.stop()
 
 
+@contextmanager
+def blackhole():
+    """Local address where connection attempts hang like with a dropped SYN:
+    the listen backlog is full and nobody accepts.
+    """
+    listener = socket.socket()
+    listener.bind((TEST_HOST, 0))
+    listener.listen(0)
+    address = listener.getsockname()
+    filler = socket.create_connection(address)
+    try:
+        yield address
+    finally:
+        filler.close()
+        listener.close()
+
+
 def check_upload(body, headers=None, length=None):
     def wsgi_handler(env, start_response):
         assert body == env["wsgi.input"].read()
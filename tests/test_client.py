@@ -1,15 +1,30 @@
+import io
+import gc
 import json
+import os
 import socket
 
+import gevent.event
 import gevent.pool
 import gevent.queue
 import gevent.server
 import pytest
 
 from geventhttpclient import __version__
-from geventhttpclient.client import METHOD_GET, HTTPClient
+from geventhttpclient.client import (
+    METHOD_GET,
+    SEND_COALESCE_SIZE,
+    HTTPClient,
+    HTTPClientPool,
+    _iter_header_items,
+    _send_stream,
+    _sendall_buffers,
+)
 from geventhttpclient.connectionpool import ConnectionPool
-from tests.common import HTTPBIN_HOST, LISTENER, check_upload, server, wsgiserver
+from geventhttpclient.header import Headers
+from geventhttpclient.response import HTTPDeadlineExceeded, HTTPLineTooLong, HTTPSocketPoolResponse
+from geventhttpclient.url import URL
+from tests.common import HTTPBIN_HOST, LISTENER, blackhole, check_upload, server, wsgiserver
 
 
 def httpbin_client(
@@ -76,6 +91,70 @@ def test_build_request_host(host, port):
     assert host_ref in client._build_request(METHOD_GET, "").lower()
 
 
+def test_build_request_head_cached_defaults():
+    client = HTTPClient("localhost", 8080, headers={"Accept": "*/*"})
+    head = client._build_request_head(METHOD_GET, "/")
+    assert isinstance(head, bytearray)
+    assert head == (
+        b"GET / HTTP/1.1\r\n"
+        b"User-Agent: python/gevent-http-client-" + __version__.encode() + b"\r\n"
+        b"Accept: */*\r\n"
+        b"Host: localhost:8080\r\n\r\n"
+    )
+    # reading the attribute keeps the encoded headers
+    lines = client._get_default_header_lines()
+    assert client.default_headers["Accept"] == "*/*"
+    assert client._get_default_header_lines() is lines
+    # modifications through the attribute are picked up
+    client.default_headers["X-Added"] = "1"
+    assert b"X-Added: 1\r\n" in client._build_request_head(METHOD_GET, "/")
+    client.default_headers = Headers({"Host": "example.com"})
+    assert client._build_request_head(METHOD_GET, "/") == (
+        b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"accept": "text/html", "X-Other": 1},
+        Headers([("X-Other", "0"), ("accept", "text/html"), ("X-Other", 1)]),
+        [("accept", "text/html"), ("X-Other", 1)],
+        {"Host": "example.com:1234", "Content-Length": "3", "user-agent": "test"},
+    ],
+)
+def test_build_request_head_same_as_merged(headers):
+    client = HTTPClient("localhost", headers={"Accept": "*/*"})
+    merged = Headers()
+    merged.update(client.default_headers)
+    merged.update(headers)
+    if "host" not in merged:
+        merged["Host"] = "localhost"
+    if "content-length" not in merged:
+        merged["Content-Length"] = 3
+    expected = "POST /path HTTP/1.1\r\n"
+    expected += "".join(f"{field}: {value}\r\n" for field, value in merged.items()) + "\r\n"
+    head = client._build_request_head("POST", "/path", body=b"abc", headers=headers)
+    assert head.decode() == expected
+
+
+def test_iter_header_items():
+    headers = Headers([("X-A", "1"), ("x-a", "2"), ("X-B", "3")])
+    assert list(_iter_header_items(headers)) == [("X-A", "1"), ("x-a", "2"), ("X-B", "3")]
+    assert list(_iter_header_items({"X-A": "1"})) == [("X-A", "1")]
+    assert list(_iter_header_items([("X-A", "1"), ("X-A", "2")])) == [("X-A", "1"), ("X-A", "2")]
+
+
+def test_build_request_head_chunked():
+    client = HTTPClient("localhost")
+    head = client._build_request_head("POST", "/", headers={"Accept": "*/*"}, chunked=True)
+    assert head.endswith(b"Accept: */*\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n")
+    head = client._build_request_head(
+        "POST", "/", headers={"transfer-encoding": "chunked"}, chunked=True
+    )
+    assert head.lower().count(b"transfer-encoding") == 1
+
+
 test_url_client_args = [
     ("http://python.org", ("python.org", 80)),
     ("http://python.org:333", ("python.org", 333)),
@@ -140,6 +219,40 @@ def test_readline():
         assert [x["index"] for x in lines] == [x for x in range(0, 100)]
 
 
+def test_iter_lines():
+    with server(readline_iter):
+        client = HTTPClient(*LISTENER, block_size=7)
+        response = client.get("/")
+        lines = [json.loads(line) for line in response.iter_lines()]
+        assert [x["index"] for x in lines] == list(range(100))
+
+
+def unterminated_lines(sock, addr):
+    sock.recv(1024)
+    sock.sendall(b"HTTP/1.1 200 Ok\r\nConnection: close\r\n\r\n")
+    sock.sendall(b"first\r\nsecond\r\nlast")
+
+
+def test_iter_lines_keepends_and_last_line():
+    with server(unterminated_lines):
+        client = HTTPClient(*LISTENER, block_size=3)
+        response = client.get("/")
+        assert list(response.iter_lines(b"\r\n", keepends=True)) == [
+            b"first\r\n",
+            b"second\r\n",
+            b"last",
+        ]
+
+
+def test_readline_max_length():
+    with server(unterminated_lines):
+        client = HTTPClient(*LISTENER, block_size=3)
+        response = client.get("/")
+        assert response.readline(max_length=7) == b"first\r\n"
+        with pytest.raises(HTTPLineTooLong):
+            response.readline(max_length=7)
+
+
 def chunks_iter(sock, addr):
     sock.recv(1024)
     sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 10\r\nConnection: close\r\n\r\n0123456789")
@@ -261,6 +374,525 @@ def test_unicode_post():
         client.post("/", unicode_string)
 
 
+def test_bytearray_post():
+    with wsgiserver(check_upload(b"12345", length=5)):
+        client = HTTPClient(*LISTENER)
+        client.post("/", bytearray(b"12345"))
+
+
+def test_body_parts_post():
+    parts = [b"head", "\u0229", memoryview(b"x" * 3 * 1024 * 1024), bytearray(b"tail")]
+    body = b"head\xc8\xa9" + b"x" * 3 * 1024 * 1024 + b"tail"
+    with wsgiserver(check_upload(body, length=len(body))):
+        client = HTTPClient(*LISTENER)
+        client.post("/", parts)
+
+
+def body_generator():
+    yield b"head"
+    yield ""
+    yield "\u0229"
+    yield memoryview(b"x" * 100000)
+    yield bytearray(b"tail")
+
+
+STREAMED_BODY = b"head\xc8\xa9" + b"x" * 100000 + b"tail"
+
+
+def check_chunked_upload(body, chunked=True):
+    def wsgi_handler(env, start_response):
+        assert env.get("HTTP_TRANSFER_ENCODING") == ("chunked" if chunked else None)
+        assert env["wsgi.input"].read() == body
+        start_response("200 OK", [])
+        return []
+
+    return wsgi_handler
+
+
+def test_generator_post():
+    with wsgiserver(check_chunked_upload(STREAMED_BODY)):
+        client = HTTPClient(*LISTENER)
+        assert client.post("/", body_generator()).status_code == 200
+
+
+def test_readable_post():
+    with wsgiserver(check_chunked_upload(STREAMED_BODY)):
+        client = HTTPClient(*LISTENER, block_size=1000)
+        assert client.post("/", io.BytesIO(STREAMED_BODY)).status_code == 200
+
+
+def test_queue_post():
+    queue = gevent.queue.Queue(maxsize=1)
+
+    def produce():
+        for chunk in body_generator():
+            queue.put(chunk)
+        queue.put(StopIteration)
+
+    with wsgiserver(check_chunked_upload(STREAMED_BODY)):
+        client = HTTPClient(*LISTENER)
+        producer = gevent.spawn(produce)
+        assert client.post("/", queue).status_code == 200
+        producer.get()
+
+
+def test_generator_post_with_content_length():
+    headers = {"Content-Length": str(len(STREAMED_BODY))}
+    with wsgiserver(check_chunked_upload(STREAMED_BODY, chunked=False)):
+        client = HTTPClient(*LISTENER)
+        assert client.post("/", body_generator(), headers=headers).status_code == 200
+
+
+def test_generator_post_http_10():
+    client = HTTPClient(*LISTENER, version=HTTPClient.HTTP_10)
+    with pytest.raises(ValueError):
+        client.post("/", body_generator())
+
+
+def test_generator_post_producer_error():
+    def failing_body():
+        yield b"start"
+        raise ZeroDivisionError()
+
+    def wsgi_handler(env, start_response):
+        start_response("200 OK", [])
+        return []
+
+    with wsgiserver(wsgi_handler):
+        client = HTTPClient(*LISTENER, concurrency=1)
+        with pytest.raises(ZeroDivisionError):
+            client.post("/", failing_body())
+        # the connection got released
+        with gevent.Timeout(1):
+            client.post("/", b"")
+
+
+def test_send_stream_backpressure():
+    sock = SendmsgSocket(1000)
+    sent_before = []
+
+    def body():
+        for chunk in (b"a" * 10, b"b" * 20):
+            sent_before.append(bytes(sock.data))
+            yield chunk
+
+    _send_stream(sock, b"HEAD\r\n\r\n", body())
+    # every chunk is on the wire before the next one is produced
+    assert sent_before == [b"", b"HEAD\r\n\r\na\r\n" + b"a" * 10 + b"\r\n"]
+    assert sock.data.endswith(b"14\r\n" + b"b" * 20 + b"\r\n0\r\n\r\n")
+
+
+def test_expect_continue():
+    headers = {"Expect": "100-continue"}
+    with wsgiserver(check_upload(b"12345", length=5)):
+        # the server answers with 100 Continue before the timeout
+        client = HTTPClient(*LISTENER, expect_continue_timeout=10)
+        with gevent.Timeout(2):
+            response = client.post("/", b"12345", headers=headers)
+        assert response.status_code == 200
+    with wsgiserver(check_chunked_upload(STREAMED_BODY)):
+        client = HTTPClient(*LISTENER, expect_continue_timeout=10)
+        with gevent.Timeout(2):
+            response = client.post("/", body_generator(), headers=headers)
+        assert response.status_code == 200
+
+
+def test_expect_continue_rejected():
+    closed = gevent.event.Event()
+
+    def reject_upload(sock, addr):
+        head = sock.recv(1024)
+        assert head.endswith(b"\r\n\r\n")
+        sock.sendall(b"HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\n\r\n")
+        # the body never arrives, the client closes the connection instead
+        assert sock.recv(1024) == b""
+        closed.set()
+
+    with server(reject_upload):
+        client = HTTPClient(*LISTENER, expect_continue_timeout=10)
+        response = client.post("/", b"x" * 100000, headers={"Expect": "100-continue"})
+        assert response.status_code == 413
+        assert closed.wait(2)
+
+
+def test_expect_continue_timeout():
+    def ignore_expect(sock, addr):
+        data = sock.recv(1024)
+        assert data.endswith(b"\r\n\r\n")
+        while len(data) < data.index(b"\r\n\r\n") + 4 + 5:
+            data += sock.recv(1024)
+        assert data.endswith(b"\r\n\r\n12345")
+        sock.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+
+    with server(ignore_expect):
+        client = HTTPClient(*LISTENER, expect_continue_timeout=0.05)
+        with gevent.Timeout(2):
+            response = client.post("/", b"12345", headers={"Expect": "100-continue"})
+        assert response.status_code == 200
+
+
+def test_expect_other_than_100_continue():
+    client = HTTPClient(*LISTENER, headers={"Expect": "100-Continue"})
+    assert client._expects_continue()
+    # the request headers replace the default ones
+    assert not client._expects_continue({"expect": "something-else"})
+    client.default_headers = Headers()
+    assert not client._expects_continue([("Expect", "something-else")])
+
+    def answer_at_once(sock, addr):
+        data = sock.recv(1024)
+        while not data.endswith(b"\r\n\r\n12345"):
+            data += sock.recv(1024)
+        sock.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+
+    with server(answer_at_once):
+        client = HTTPClient(*LISTENER, expect_continue_timeout=10)
+        with gevent.Timeout(2):
+            # the body isn't held back
+            response = client.post("/", b"12345", headers={"Expect": "something-else"})
+        assert response.status_code == 200
+
+
+def slow_drip(sock, addr):
+    sock.recv(1024)
+    sock.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n")
+    for _ in range(100):
+        gevent.sleep(0.05)
+        sock.sendall(b"x")
+
+
+def test_request_timeout_slow_body():
+    with server(slow_drip):
+        # every byte arrives well within the network_timeout
+        client = HTTPClient(*LISTENER, network_timeout=1)
+        response = client.request("GET", "/", timeout=0.3)
+        assert response.status_code == 200
+        with gevent.Timeout(2):
+            with pytest.raises(HTTPDeadlineExceeded):
+                response.read()
+        # the incomplete response doesn't go back to the pool
+        assert response._sock is None
+
+
+def test_request_timeout_no_response():
+    def silent(sock, addr):
+        sock.recv(1024)
+        gevent.sleep(10)
+
+    with server(silent):
+        client = HTTPClient(*LISTENER, network_timeout=5)
+        with gevent.Timeout(2):
+            with pytest.raises(HTTPDeadlineExceeded):
+                client.request("GET", "/", timeout=0.1)
+        assert client._connection_pool._semaphore.counter == client._connection_pool.size
+
+
+def test_request_network_timeout():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=1, network_timeout=5)
+        assert client.get("/slow").read() == b"/slow"
+        with gevent.Timeout(2):
+            with pytest.raises(socket.timeout):
+                client.request("GET", "/slow", network_timeout=0.02)
+        assert client.request("GET", "/fast", network_timeout=1).read() == b"/fast"
+        # the connection went back to the pool with the timeout of the client
+        (sock,) = client._connection_pool._socket_queue.queue
+        assert sock.gettimeout() == 5
+
+
+def test_request_connection_timeout():
+    timeouts = []
+
+    class RecordingPool(ConnectionPool):
+        def _connect_socket(self, sock, address):
+            timeouts.append(sock.gettimeout())
+            return super()._connect_socket(sock, address)
+
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, connection_timeout=5)
+        client._connection_pool = RecordingPool(*LISTENER, *LISTENER, connection_timeout=5)
+        headers = {"Connection": "close"}
+        client.request("GET", "/", headers=headers, connection_timeout=0.5).read()
+        client.request("GET", "/", headers=headers).read()
+    assert timeouts == [0.5, 5]
+
+
+def test_create_socket_override_without_timeout():
+    created = []
+
+    class CustomPool(ConnectionPool):
+        def _create_socket(self):
+            sock = super()._create_socket()
+            created.append(sock)
+            return sock
+
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER)
+        client._connection_pool = CustomPool(*LISTENER, *LISTENER)
+        assert client.get("/").read() == b"/"
+    assert len(created) == 1
+
+
+class PipelineServer:
+    """Answers every request with its path as body. Records the number of
+    requests received before their response was sent."""
+
+    def __init__(self, answers_per_connection=None, close_header=False):
+        self.answers_per_connection = answers_per_connection
+        self.close_header = close_header
+        self.connections = 0
+        self.max_outstanding = 0
+
+    def __call__(self, sock, addr):
+        self.connections += 1
+        answered = 0
+        data = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+            *heads, data = data.split(b"\r\n\r\n")
+            self.max_outstanding = max(self.max_outstanding, len(heads))
+            for head in heads:
+                method, path, _ = head.split(b"\r\n", 1)[0].split(b" ")
+                last = answered + 1 == self.answers_per_connection
+                close = b"Connection: close\r\n" if last and self.close_header else b""
+                response = b"HTTP/1.1 200 OK\r\n%sContent-Length: %d\r\n\r\n" % (close, len(path))
+                if method != b"HEAD":
+                    response += path
+                sock.sendall(response)
+                answered += 1
+                if last:
+                    sock.close()
+                    return
+
+
+def test_pipeline():
+    handler = PipelineServer()
+    with server(handler):
+        client = HTTPClient(*LISTENER)
+        requests = ["/0", "/1", ("HEAD", "/2"), ("get", "/3", {"X-Test": "1"})]
+        responses = list(client.pipeline(requests))
+        assert [response.read() for response in responses] == [b"/0", b"/1", b"", b"/3"]
+        assert all(response.status_code == 200 for response in responses)
+        assert responses[2]["content-length"] == "2"
+        assert b"X-Test: 1\r\n" in responses[3]._sent_request
+        assert isinstance(responses[3]._sent_request, bytes)
+        assert handler.connections == 1
+        # the requests were sent without waiting for the responses
+        assert handler.max_outstanding > 1
+        # the connection is reused afterwards
+        assert client.get("/4").read() == b"/4"
+        assert handler.connections == 1
+
+
+def test_pipeline_depth():
+    handler = PipelineServer()
+    with server(handler):
+        client = HTTPClient(*LISTENER)
+        uris = [f"/{index}" for index in range(10)]
+        responses = client.pipeline(uris, depth=3)
+        assert [response.read() for response in responses] == [uri.encode() for uri in uris]
+        assert handler.max_outstanding <= 3
+
+
+@pytest.mark.parametrize("close_header", [False, True])
+def test_pipeline_server_closes(close_header):
+    handler = PipelineServer(answers_per_connection=2, close_header=close_header)
+    with server(handler):
+        client = HTTPClient(*LISTENER)
+        uris = [f"/{index}" for index in range(5)]
+        responses = client.pipeline(uris)
+        # unanswered requests are sent again on a new connection
+        assert [response.read() for response in responses] == [uri.encode() for uri in uris]
+        assert handler.connections == 3
+
+
+def test_pipeline_stopped_early():
+    handler = PipelineServer()
+    with server(handler):
+        client = HTTPClient(*LISTENER, concurrency=1)
+        responses = client.pipeline(["/0", "/1", "/2"])
+        assert next(responses).read() == b"/0"
+        responses.close()
+        # the connection with outstanding responses got released
+        with gevent.Timeout(1):
+            assert client.get("/3").read() == b"/3"
+
+
+def test_pipeline_invalid_method():
+    client = HTTPClient(*LISTENER)
+    with pytest.raises(ValueError):
+        client.pipeline(["/", ("POST", "/")])
+
+
+def echo_path(env, start_response):
+    path = env["PATH_INFO"]
+    if path == "/slow":
+        gevent.sleep(0.1)
+    start_response("200 OK", [])
+    return [path.encode()]
+
+
+def test_unread_response_freed_without_gc():
+    body = b"x" * 100_000
+
+    def app(env, start_response):
+        start_response("200 OK", [("Content-Length", str(len(body)))])
+        return [body]
+
+    with wsgiserver(app):
+        client = HTTPClient(*LISTENER, concurrency=1)
+        gc.disable()
+        try:
+            # the dropped response gives back the only connection when freed
+            client.get("/")
+            with gevent.Timeout(2):
+                assert client.get("/").read() == body
+        finally:
+            gc.enable()
+
+
+def test_map():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=2)
+        uris = [f"/{index}" for index in range(20)]
+        responses = client.map(uris + [("POST", "/post", b"body")], concurrency=5)
+        assert [response.read() for response in responses] == [
+            uri.encode() for uri in uris + ["/post"]
+        ]
+        # the bodies were read, all connections are back in the pool
+        assert all(response._sock is None for response in responses)
+
+
+def test_map_more_requests_than_connections():
+    body = b"x" * 100_000
+
+    def app(env, start_response):
+        start_response("200 OK", [("Content-Length", str(len(body)))])
+        return [body]
+
+    with wsgiserver(app):
+        client = HTTPClient(*LISTENER, concurrency=2)
+        with gevent.Timeout(5):
+            responses = client.map(["/"] * 5)
+        assert [response.read() for response in responses] == [body] * 5
+
+
+def test_map_errors():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER)
+        responses = client.map(["/0", "http://example.com/", "/2"])
+        assert responses[0].read() == b"/0"
+        assert isinstance(responses[1], ValueError)
+        assert responses[2].read() == b"/2"
+        with pytest.raises(ValueError):
+            client.map(["/0", "http://example.com/"], return_exceptions=False)
+
+
+def test_imap_unordered():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=3)
+        uris = ["/slow", "/1", "/2", "/3"]
+        results = list(client.imap_unordered(uris))
+        # results are yielded as soon as they are complete
+        assert results[-1][0] == "/slow"
+        assert sorted(request for request, _ in results) == sorted(uris)
+        assert all(response.read() == request.encode() for request, response in results)
+
+
+def test_imap_unordered_unbuffered():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=2)
+        uris = [f"/{index}" for index in range(10)]
+        results = client.imap_unordered(uris, buffer_body=False)
+        with gevent.Timeout(2):
+            bodies = {response.read() for _, response in results}
+        assert bodies == {uri.encode() for uri in uris}
+
+
+class SendmsgSocket:
+    """Accepts at most max_send bytes per call, like a full socket buffer."""
+
+    def __init__(self, max_send, sendmsg=True):
+        self.max_send = max_send
+        self.data = bytearray()
+        self.calls = []
+        if not sendmsg:
+            self.sendmsg = self._no_sendmsg
+
+    def sendmsg(self, buffers):
+        self.calls.append(len(buffers))
+        data = b"".join(buffers)[: self.max_send]
+        self.data += data
+        return len(data)
+
+    def _no_sendmsg(self, buffers):
+        raise NotImplementedError("sendmsg not allowed")
+
+    def sendall(self, data):
+        self.calls.append(bytes(data))
+        self.data += data
+
+
+@pytest.mark.parametrize("max_send", [1, 3, 7, 1000])
+def test_sendall_buffers_partial(max_send):
+    buffers = [b"GET / HTTP/1.1\r\n\r\n", b"", bytearray(b"abc"), memoryview(b"defgh")]
+    sock = SendmsgSocket(max_send)
+    _sendall_buffers(sock, buffers)
+    assert sock.data == b"GET / HTTP/1.1\r\n\r\nabcdefgh"
+    assert all(isinstance(call, int) for call in sock.calls)
+
+
+def test_sendall_buffers_without_sendmsg():
+    head = b"POST / HTTP/1.1\r\n\r\n"
+    large = b"x" * SEND_COALESCE_SIZE
+    sock = SendmsgSocket(0, sendmsg=False)
+    _sendall_buffers(sock, [head, b"small", large, b"end"])
+    assert sock.data == head + b"small" + large + b"end"
+    # small buffers are joined, large ones sent on their own
+    assert sock.calls == [head + b"small", large, b"end"]
+
+
+def test_recv_buffer_reused_on_keep_alive():
+    def hello(env, start_response):
+        start_response("200 OK", [("Content-Length", "5")])
+        return [b"hello"]
+
+    with wsgiserver(hello):
+        client = HTTPClient(*LISTENER)
+        buffers = []
+        for _ in range(3):
+            response = client.get("/")
+            assert response.read() == b"hello"
+            buffers.append(response._recv_view.obj)
+        assert buffers[0] is buffers[1] is buffers[2]
+        assert len(client._connection_pool._recv_buffers) == 1
+        client.close()
+        assert not client._connection_pool._recv_buffers
+
+
+def test_recv_buffer_grows_for_large_reads():
+    body = b"x" * 1_000_000
+
+    def app(env, start_response):
+        start_response("200 OK", [("Content-Length", str(len(body)))])
+        return [body]
+
+    with wsgiserver(app):
+        client = HTTPClient(*LISTENER, block_size=4096)
+        response = client.get("/")
+        assert response.read(100) == body[:100]
+        assert len(response._recv_view) == 4096
+        assert response.read(len(body)) == body[100:]
+        assert len(response._recv_view) == HTTPSocketPoolResponse.MAX_RECV_SIZE
+        # kept for the next response on the connection
+        response = client.get("/")
+        assert len(response._recv_view) == HTTPSocketPoolResponse.MAX_RECV_SIZE
+        assert response.read() == body
+
+
 # The tests below require online access. We should try to replace them at least
 # partly with local testing solutions and have the online tests as an extra on top.
 
@@ -381,3 +1013,248 @@ class TestIsSocketAlive:
             assert pool._is_socket_alive(s1) is False
         finally:
             s1.close()
+
+    def test_file_descriptor_above_fd_setsize(self):
+        s1, s2 = socket.socketpair()
+        try:
+            high = socket.socket(fileno=os.dup2(s1.fileno(), 2000))
+        except OSError:
+            pytest.skip("file descriptor limit too low")
+        try:
+            pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80)
+            assert pool._is_socket_alive(high) is True
+            s2.sendall(b"x")
+            assert pool._is_socket_alive(high) is False
+        finally:
+            high.close()
+            s1.close()
+            s2.close()
+
+    def test_alive_check_grace(self):
+        s1, s2 = socket.socketpair()
+        checked = []
+        try:
+            pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80, size=1, alive_check_grace=10)
+            pool._is_socket_alive = lambda sock: checked.append(sock) or True
+            pool._semaphore.acquire()
+            pool.return_socket(s1)
+            assert pool.get_socket() is s1
+            assert checked == []
+            pool.alive_check_grace = 0.0
+            pool._returned_at.clear()
+            pool.return_socket(s1)
+            assert pool.get_socket() is s1
+            assert checked == [s1]
+        finally:
+            s1.close()
+            s2.close()
+
+
+def remote_port(env, start_response):
+    headers = [("Connection", "close")] if env["PATH_INFO"] == "/close" else []
+    start_response("200 OK", headers)
+    return [env["REMOTE_PORT"].encode()]
+
+
+class TestPoolEviction:
+    """Idle timeout, max lifetime and max requests of pooled sockets"""
+
+    def ports(self, client, count, pause=0):
+        ports = []
+        for _ in range(count):
+            gevent.sleep(pause)
+            ports.append(client.get("/").read())
+        return ports
+
+    def test_idle_timeout(self):
+        with wsgiserver(remote_port):
+            client = HTTPClient(*LISTENER, idle_timeout=0.05)
+            client._connection_pool._reaper.kill()
+            first = client.get("/").read()
+            gevent.sleep(0.01)
+            second = client.get("/").read()
+            gevent.sleep(0.08)
+            # expired on checkout
+            assert first == second != client.get("/").read()
+
+    def test_reaper(self):
+        with wsgiserver(remote_port):
+            client = HTTPClient(*LISTENER, idle_timeout=0.05)
+            client.get("/").read()
+            pool = client._connection_pool
+            assert pool._socket_queue.qsize() == 1
+            gevent.sleep(0.1)
+            # closed in the background, without checking it out
+            assert pool._socket_queue.qsize() == 0
+            assert not pool._returned_at
+            client.close()
+            pool._reaper.join(timeout=1)
+            assert pool._reaper.dead
+
+    def test_max_lifetime(self):
+        with wsgiserver(remote_port):
+            client = HTTPClient(*LISTENER, max_lifetime=0.4)
+            client._connection_pool._reaper.kill()
+            ports = self.ports(client, 2) + self.ports(client, 1, pause=0.1)
+            ports += self.ports(client, 1, pause=0.4)
+            # the connection got replaced although it was never idle long
+            assert ports[0] == ports[1] == ports[2] != ports[3]
+
+    def test_max_requests(self):
+        with wsgiserver(remote_port):
+            client = HTTPClient(*LISTENER, max_requests=2)
+            ports = self.ports(client, 5)
+            assert ports[0] == ports[1] != ports[2] == ports[3] != ports[4]
+            assert client._connection_pool._reaper is None
+
+    def test_reap_dead_socket(self):
+        s1, s2 = socket.socketpair()
+        pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80, size=2)
+        pool._semaphore.acquire()
+        pool.return_socket(s1)
+        assert pool.reap() == 0
+        s2.close()
+        assert pool.reap() == 1
+        assert s1.fileno() < 0
+
+    def test_reaper_does_not_keep_pool_alive(self):
+        import gc
+        import weakref
+
+        pool = ConnectionPool("127.0.0.1", 80, "127.0.0.1", 80, reap_interval=0.01)
+        reaper = pool._reaper
+        pool_ref = weakref.ref(pool)
+        del pool
+        gc.collect()
+        assert pool_ref() is None
+        reaper.join(timeout=1)
+        assert reaper.dead
+
+
+class TestPoolWarming:
+    """Opening connections ahead of the requests"""
+
+    def connections(self):
+        accepted = []
+
+        def handler(sock, addr):
+            accepted.append(addr)
+            while sock.recv(4096):
+                sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 2\r\n\r\nok")
+
+        return accepted, handler
+
+    def test_warm(self):
+        accepted, handler = self.connections()
+        with server(handler):
+            client = HTTPClient(*LISTENER, concurrency=3)
+            gevent.joinall(client.warm(), raise_error=True)
+            pool = client._connection_pool
+            assert pool._socket_queue.qsize() == 3
+            assert client.warm() == []
+            requests = [gevent.spawn(lambda: client.get("/").read()) for _ in range(3)]
+            gevent.joinall(requests, raise_error=True)
+            assert [request.value for request in requests] == [b"ok"] * 3
+            assert len(accepted) == 3
+
+    def test_min_idle(self):
+        accepted, handler = self.connections()
+        with server(handler):
+            client = HTTPClient(*LISTENER, concurrency=3, min_idle=2)
+            pool = client._connection_pool
+            gevent.sleep(0.05)
+            assert pool._socket_queue.qsize() == 2
+            sock = pool.get_socket()
+            gevent.sleep(0.05)
+            # topped up while the connection is in use
+            assert pool._socket_queue.qsize() == 2
+            pool.return_socket(sock)
+            assert pool._socket_queue.qsize() == 3
+            assert client.get("/").read() == b"ok"
+            # closed connections get replaced, within the pool size
+            socks = [pool.get_socket(), pool.get_socket()]
+            gevent.sleep(0.05)
+            assert pool._socket_queue.qsize() == 1
+            for sock in socks:
+                pool.release_socket(sock)
+            gevent.sleep(0.05)
+            assert pool._socket_queue.qsize() == 2
+            assert len(accepted) == 4
+
+    def test_min_idle_at_capacity(self):
+        accepted, handler = self.connections()
+        with server(handler):
+            client = HTTPClient(*LISTENER, concurrency=2, min_idle=2)
+            pool = client._connection_pool
+            gevent.sleep(0.05)
+            socks = [pool.get_socket(), pool.get_socket()]
+            # no room for idle connections, no greenlets get spawned
+            assert pool._warming == 0
+            assert pool.warm() == []
+            pool.return_socket(socks.pop())
+            assert pool._warming == 0
+            pool.release_socket(socks.pop())
+            assert pool._warming == 1
+            gevent.sleep(0.05)
+            assert pool._socket_queue.qsize() == 2
+            assert len(accepted) == 3
+
+    def test_warm_unreachable(self):
+        with blackhole() as dead:
+            pool = ConnectionPool(*dead, *dead, size=2, connection_timeout=0.05)
+            greenlets = pool.warm()
+            gevent.joinall(greenlets, timeout=1)
+            assert all(greenlet.successful() for greenlet in greenlets)
+            assert pool._socket_queue.qsize() == 0
+            assert pool._semaphore.counter == 2
+
+
+class TestPoolStats:
+    def test_counters(self):
+        with wsgiserver(remote_port):
+            client = HTTPClient(*LISTENER, concurrency=2)
+            client.get("/").read()
+            client.get("/").read()
+            client.get("/close").read()
+            stats = client.stats()
+        assert stats["created"] == 1
+        assert stats["reused"] == 2
+        assert stats["discarded"] == 1
+        assert stats["connect_errors"] == stats["dead"] == stats["expired"] == 0
+        assert (stats["size"], stats["idle"], stats["in_use"], stats["waiting"]) == (2, 0, 0, 0)
+        assert stats["wait_count"] == 3
+        assert stats["wait_histogram"][0.001] == 3
+
+    def test_gauges_and_wait_time(self):
+        pool = ConnectionPool(*LISTENER, *LISTENER, size=1)
+        s1, s2 = socket.socketpair()
+        pool._semaphore.acquire()
+        pool.return_socket(s1)
+        sock = pool.get_socket()
+        waiter = gevent.spawn(pool.get_socket)
+        gevent.sleep(0.02)
+        stats = pool.stats()
+        assert (stats["idle"], stats["in_use"], stats["waiting"]) == (0, 1, 1)
+        gevent.sleep(0.02)
+        pool.return_socket(sock)
+        assert waiter.get(timeout=1) is sock
+        stats = pool.stats()
+        assert stats["wait_count"] == 2
+        assert stats["wait_time"] >= 0.04
+        assert stats["wait_histogram"][0.01] == 1
+        assert stats["wait_histogram"][0.1] == 2
+        assert stats["wait_histogram"][float("inf")] == 2
+        s2.close()
+        pool.return_socket(sock)
+        assert pool.reap() == 1
+        assert pool.stats()["dead"] == 1
+
+    def test_client_pool(self):
+        with wsgiserver(remote_port):
+            clientpool = HTTPClientPool()
+            for host in ("127.0.0.1", "localhost"):
+                clientpool.get_client(URL(f"http://{host}:{LISTENER[1]}/")).get("/").read()
+            stats = clientpool.stats()
+        assert stats["created"] == 2
+        assert stats["size"] == 2
+        assert stats["wait_histogram"][float("inf")] == 2
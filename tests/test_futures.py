@@ -0,0 +1,131 @@
+from concurrent.futures import CancelledError
+
+import gevent
+import pytest
+
+from geventhttpclient.client import HTTPClient
+from geventhttpclient.futures import RequestFuture, as_completed, gather
+from geventhttpclient.useragent import UserAgent
+from tests.common import LISTENER, LISTENER_URL, wsgiserver
+
+
+def echo_path(env, start_response):
+    path = env["PATH_INFO"]
+    if path.startswith("/sleep"):
+        gevent.sleep(float(path.rsplit("/", 1)[1]))
+    start_response("200 OK", [])
+    return [path.encode()]
+
+
+def test_request_async():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER)
+        future = client.request_async("GET", "/test")
+        assert not future.done()
+        assert future.result(timeout=2).read() == b"/test"
+        assert future.done()
+        assert future.exception() is None
+
+
+def test_urlopen_async():
+    with wsgiserver(echo_path):
+        future = UserAgent().urlopen_async(LISTENER_URL + "test")
+        assert future.result(timeout=2).content == b"/test"
+
+
+def test_gather():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=3)
+        futures = [client.request_async("GET", uri) for uri in ("/sleep/0.05", "/a", "/b")]
+        responses = gather(futures, timeout=2)
+        assert [response.read() for response in responses] == [b"/sleep/0.05", b"/a", b"/b"]
+
+
+def test_gather_exceptions():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=2)
+        futures = [
+            client.request_async("GET", "/sleep/10"),
+            client.request_async("GET", "http://example.com/"),
+        ]
+        with gevent.Timeout(2):
+            # raised right away, without waiting for the slow request
+            with pytest.raises(ValueError):
+                gather(futures)
+        # the slow request got cancelled and its connection released
+        assert futures[0].cancelled()
+        with gevent.Timeout(2):
+            assert gather([client.request_async("GET", "/c") for _ in range(2)])
+        slow = client.request_async("GET", "/sleep/10")
+        with pytest.raises(gevent.Timeout):
+            gather([slow], timeout=0.05)
+        assert slow.cancelled()
+
+        futures = [
+            client.request_async("GET", "/a"),
+            client.request_async("GET", "http://example.com/"),
+        ]
+        response, error = gather(futures, return_exceptions=True)
+        assert response.read() == b"/a"
+        assert isinstance(error, ValueError)
+
+
+def test_as_completed():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=3)
+        slow = client.request_async("GET", "/sleep/0.05")
+        fast = client.request_async("GET", "/fast")
+        assert list(as_completed([slow, fast], timeout=2)) == [fast, slow]
+        gather([slow, fast])
+
+
+def test_as_completed_timeout():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=2)
+        slow = client.request_async("GET", "/sleep/10")
+        fast = client.request_async("GET", "/fast")
+        completed = []
+        with pytest.raises(gevent.Timeout):
+            for future in as_completed([slow, fast], timeout=0.2):
+                completed.append(future)
+        assert completed == [fast]
+        with pytest.raises(gevent.Timeout):
+            slow.result(timeout=0.01)
+        slow.cancel()
+
+
+def test_cancel():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER, concurrency=1)
+        future = client.request_async("GET", "/sleep/10")
+        gevent.sleep(0.05)
+        assert future.cancel()
+        assert future.cancelled()
+        assert not future.cancel()
+        with pytest.raises(CancelledError):
+            future.result()
+        # the connection of the killed request got released
+        assert client.request_async("GET", "/next").result(timeout=2).read() == b"/next"
+
+
+def test_then_and_callbacks():
+    with wsgiserver(echo_path):
+        client = HTTPClient(*LISTENER)
+        done = []
+        future = client.request_async("GET", "/test")
+        future.add_done_callback(done.append)
+        body = future.then(lambda response: response.read())
+        assert body.result(timeout=2) == b"/test"
+        assert done == [future]
+
+        failed = client.request_async("GET", "http://example.com/")
+        with pytest.raises(ValueError):
+            failed.then(lambda response: response.read()).result(timeout=2)
+        assert repr(failed) == "<RequestFuture failed>"
+
+
+def test_future_of_any_function():
+    future = RequestFuture(sum, [1, 2, 3])
+    assert repr(future) == "<RequestFuture pending>"
+    assert future.wait(1)
+    assert future.result() == 6
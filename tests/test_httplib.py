@@ -1,4 +1,6 @@
 import http.client
+import io
+import shutil
 import urllib.request
 
 import pytest
@@ -54,6 +56,43 @@ def test_msg():
         assert response.msg["Content-Type"] == "text/plain"
 
 
+def chunked_response(sock, addr):
+    sock.recv(4096)
+    sock.sendall(b"HTTP/1.1 200 Ok\r\nTransfer-Encoding: chunked\r\n\r\n")
+    for i in range(100):
+        chunk = bytes([i]) * 1000
+        sock.sendall(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+    sock.sendall(b"0\r\n\r\n")
+
+
+def test_readinto():
+    with server(chunked_response):
+        connection = HTTPConnection(*LISTENER)
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        buf = bytearray(1500)
+        received = bytearray()
+        while True:
+            length = response.readinto(buf)
+            if not length:
+                break
+            assert length <= len(buf)
+            received += buf[:length]
+        assert received == b"".join(bytes([i]) * 1000 for i in range(100))
+
+
+def test_buffered_reader():
+    with server(chunked_response):
+        connection = HTTPConnection(*LISTENER)
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        target = io.BytesIO()
+        with io.BufferedReader(response, buffer_size=4096) as reader:
+            shutil.copyfileobj(reader, target, 3000)
+        assert target.getvalue() == b"".join(bytes([i]) * 1000 for i in range(100))
+        assert response.closed
+
+
 def test_patched():
     assert http.client.HTTPResponse.__module__ == "http.client"
     assert http.client.HTTPConnection.__module__ == "http.client"
@@ -82,7 +82,7 @@ def test_keep_alive_bodyless_10x_request_with_body():
 def test_close_connection_and_no_content_length():
     response = HTTPResponse()
     response.feed("HTTP/1.1 200 Ok\r\nConnection: close\r\n\r\nHello World!")
-    assert response._body_buffer == bytearray(b"Hello World!")
+    assert bytes(response._body_buffer) == b"Hello World!"
     assert not response.should_keep_alive()
     assert response.should_close()
 
@@ -90,6 +90,6 @@ def test_close_connection_and_no_content_length():
 def test_close_connection_with_content_length():
     response = HTTPResponse()
     response.feed("HTTP/1.1 200 Ok\r\nContent-length: 5\r\nConnection: close\r\n\r\n12345")
-    assert response._body_buffer == bytearray(b"12345")
+    assert bytes(response._body_buffer) == b"12345"
     assert not response.should_keep_alive()
     assert response.should_close()
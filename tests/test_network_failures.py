@@ -1,3 +1,4 @@
+import time
 from http.client import HTTPException
 
 import gevent.server
@@ -5,7 +6,8 @@ import gevent.socket
 import pytest
 
 from geventhttpclient.client import CRLF, HTTPClient
-from tests.common import LISTENER, server
+from geventhttpclient.connectionpool import _interleave_families
+from tests.common import LISTENER, blackhole, server
 
 
 def wrong_response_status_line(sock, addr):
@@ -152,3 +154,59 @@ def test_timeout_during_chunked_readline():
                 data = response.readline()
                 chunks.append(data)
         assert len(chunks) == 3
+
+
+def ok_response(sock, addr):
+    sock.recv(4096)
+    sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 2\r\n\r\nok")
+
+
+def resolve_to(client, *addresses):
+    """Let the client resolve its host to the given (host, port) addresses."""
+    sock_infos = [
+        (gevent.socket.AF_INET, gevent.socket.SOCK_STREAM, 6, "", address) for address in addresses
+    ]
+    client._connection_pool._resolve = lambda: sock_infos
+
+
+def test_happy_eyeballs_blackholed_address():
+    with server(ok_response), blackhole() as dead:
+        client = HTTPClient(*LISTENER, connection_timeout=5, happy_eyeballs_delay=0.05)
+        resolve_to(client, dead, LISTENER)
+        start = time.monotonic()
+        assert client.get("/").read() == b"ok"
+        assert time.monotonic() - start < 1
+
+
+def test_happy_eyeballs_refused_address():
+    with server(ok_response):
+        client = HTTPClient(*LISTENER, happy_eyeballs_delay=10)
+        # the next address is tried right away, not after the delay
+        resolve_to(client, ("127.0.0.1", 1), LISTENER)
+        with gevent.Timeout(1):
+            assert client.get("/").read() == b"ok"
+
+
+def test_happy_eyeballs_all_failing():
+    with blackhole() as dead:
+        client = HTTPClient(*LISTENER, connection_timeout=0.1, happy_eyeballs_delay=0.05)
+        resolve_to(client, dead, dead)
+        with gevent.Timeout(1):
+            with pytest.raises(gevent.socket.timeout):
+                client.get("/")
+
+
+def test_sequential_connect_blackholed_address():
+    with server(ok_response), blackhole() as dead:
+        client = HTTPClient(*LISTENER, connection_timeout=0.2)
+        resolve_to(client, dead, LISTENER)
+        start = time.monotonic()
+        assert client.get("/").read() == b"ok"
+        assert time.monotonic() - start >= 0.2
+
+
+def test_interleave_families():
+    v4 = [(gevent.socket.AF_INET, index) for index in range(3)]
+    v6 = [(gevent.socket.AF_INET6, index) for index in range(2)]
+    assert _interleave_families(v6 + v4) == [v6[0], v4[0], v6[1], v4[1], v4[2]]
+    assert _interleave_families(v4) == v4
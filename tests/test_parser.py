@@ -1,3 +1,5 @@
+import array
+import gc
 import sys
 from functools import wraps
 from http.client import HTTPException
@@ -5,7 +7,7 @@ from io import StringIO
 
 import pytest
 
-from geventhttpclient.response import HTTPResponse
+from geventhttpclient.response import HTTPPipelineParser, HTTPProtocolViolationError, HTTPResponse
 
 RESPONSE = (
     "HTTP/1.1 301 Moved Permanently\r\nLocation: http://www.google.fr/\r\n"
@@ -146,3 +148,238 @@ def test_on_message_begin():
     response._on_message_begin = on_message_begin
     with pytest.raises(RuntimeError):
         response.feed(RESPONSE)
+
+
+def test_zero_copy_body():
+    response = HTTPResponse()
+    assert response.zero_copy_body
+    views = []
+
+    def on_body(buf):
+        assert isinstance(buf, memoryview)
+        assert buf.readonly
+        views.append(buf)
+        response._body_buffer.append(buf)
+
+    response._on_body = on_body
+    response.feed(RESPONSE)
+    assert response.message_complete
+    assert len(response._body_buffer) == 218
+    # the views must not outlive the buffer passed to feed()
+    with pytest.raises(ValueError):
+        bytes(views[0])
+
+
+def test_zero_copy_body_slice_outlives_callback():
+    response = HTTPResponse()
+    slices = []
+
+    def on_body(buf):
+        slices.append(buf[:])
+
+    response._on_body = on_body
+    # the slices are the only references left to the fed bytes
+    response.feed(RESPONSE.encode())
+    gc.collect()
+    # likely to reuse the memory of the fed bytes, if they were freed
+    _filler = [b"x" * len(RESPONSE) for _ in range(100)]
+    assert b"".join(slices) == RESPONSE.encode().split(b"\r\n\r\n", 1)[1]
+
+
+def test_copy_body():
+    response = HTTPResponse()
+    response.zero_copy_body = False
+    chunks = []
+
+    def on_body(buf):
+        assert isinstance(buf, bytearray)
+        chunks.append(buf)
+
+    response._on_body = on_body
+    response.feed(RESPONSE)
+    assert len(b"".join(chunks)) == 218
+
+
+def test_callbacks_bound_on_first_feed():
+    response = HTTPResponse()
+    statuses = []
+    response._on_status = statuses.append
+    response.feed(RESPONSE[:20])
+    # callbacks are resolved once, later replacements are ignored
+    response._on_status = None
+    response.feed(RESPONSE[20:])
+    assert "".join(statuses) == "Moved Permanently"
+    assert response.message_complete
+
+
+def test_bound_callbacks_collected():
+    import gc
+    import weakref
+
+    response = HTTPResponse()
+    response._on_body = lambda buf: response._body_buffer.append(buf)
+    response.feed(RESPONSE)
+    ref = weakref.ref(response)
+    del response
+    gc.collect()
+    assert ref() is None
+
+
+def test_headers_passed_at_once():
+    response = HTTPResponse()
+    calls = []
+    response._on_headers = calls.append
+    # one byte at a time, so every header is split across several feeds
+    for char in RESPONSE:
+        response.feed(char)
+    assert response.message_complete
+    assert len(calls) == 1
+    assert calls[0][0] == ("Location", "http://www.google.fr/")
+    assert calls[0][-1] == ("X-XSS-Protection", "1; mode=block")
+    assert len(calls[0]) == 8
+
+
+def test_empty_header_value():
+    response = HTTPResponse()
+    response.feed("HTTP/1.1 200 Ok\r\nX-Empty:\r\nX-Blank: \r\nContent-Length: 0\r\n\r\n")
+    assert response.message_complete
+    assert response["x-empty"] == ""
+    assert response["x-blank"] == ""
+    assert response["content-length"] == "0"
+
+
+def test_chunked_trailers():
+    response = HTTPResponse()
+    response.feed(
+        "HTTP/1.1 200 Ok\r\nTransfer-Encoding: chunked\r\n\r\n"
+        "5\r\nhello\r\n0\r\nX-Checksum: abc\r\nX-Other: def\r\n\r\n"
+    )
+    assert response.message_complete
+    assert bytes(response._body_buffer) == b"hello"
+    assert response["x-checksum"] == "abc"
+    assert response["x-other"] == "def"
+
+
+def test_on_headers_raises():
+    response = HTTPResponse()
+
+    def on_headers(headers):
+        raise RuntimeError("error")
+
+    response._on_headers = on_headers
+    with pytest.raises(RuntimeError):
+        response.feed(RESPONSE)
+    assert not response.headers_complete
+
+
+def test_interim_responses():
+    response = HTTPResponse()
+    response.feed(
+        "HTTP/1.1 100 Continue\r\n\r\n"
+        "HTTP/1.1 103 Early Hints\r\nLink: </style.css>\r\n\r\n"
+        "HTTP/1.1 200 Ok\r\nContent-Length: 2\r\n\r\nok"
+    )
+    assert response.message_complete
+    assert response.status_code == 200
+    assert response.status_message == "Ok"
+    assert list(response.items()) == [("Content-Length", "2")]
+    assert bytes(response._body_buffer) == b"ok"
+
+
+def test_pipeline_parser():
+    parser = HTTPPipelineParser()
+    for method in ("HEAD", "GET", "GET"):
+        parser.expect(method)
+    data = (
+        "HTTP/1.1 200 Ok\r\nContent-Length: 218\r\n\r\n"
+        "HTTP/1.1 100 Continue\r\n\r\n" + RESPONSE + "HTTP/1.1 404 Not Found\r\n"
+        "Connection: close\r\nContent-Length: 2\r\n\r\nno"
+    )
+    for start in range(0, len(data), 7):
+        parser.feed(data[start : start + 7])
+    head, moved, not_found = parser.responses
+    assert head.status_code == 200
+    assert head.read() == b""
+    assert head.should_keep_alive()
+    assert moved.status_code == 301
+    assert moved["location"] == "http://www.google.fr/"
+    assert len(moved.read()) == 218
+    assert not_found.status_code == 404
+    assert not_found.version == "HTTP/1.1"
+    assert not_found.read() == b"no"
+    assert not not_found.should_keep_alive()
+    assert parser.closing
+
+
+def test_pipeline_parser_unexpected_response():
+    parser = HTTPPipelineParser()
+    with pytest.raises(HTTPProtocolViolationError):
+        parser.feed("HTTP/1.1 200 Ok\r\nContent-Length: 0\r\n\r\n")
+
+
+@pytest.mark.parametrize(
+    "wrap",
+    [
+        bytes,
+        bytearray,
+        memoryview,
+        lambda data: array.array("B", data),
+        lambda data: memoryview(b"xx" + data + b"yy")[2:-2],
+    ],
+    ids=["bytes", "bytearray", "memoryview", "array", "memoryview-slice"],
+)
+def test_feed_buffer(wrap):
+    response = HTTPResponse()
+    data = RESPONSE.encode()
+    for start in range(0, len(data), 64):
+        response.feed(wrap(data[start : start + 64]))
+    assert response.message_complete
+    assert response["content-length"] == "218"
+    assert len(response._body_buffer) == 218
+
+
+def test_feed_invalid_type():
+    response = HTTPResponse()
+    with pytest.raises(TypeError):
+        response.feed(42)
+    with pytest.raises(BufferError):
+        response.feed(memoryview(RESPONSE.encode())[::2])
+
+
+def test_reset():
+    response = HTTPResponse()
+    response.feed(RESPONSE)
+    assert response.message_complete
+    response.reset(method="HEAD")
+    assert not response.message_begun
+    assert not response.headers_complete
+    assert not response.message_complete
+    assert not list(response.items())
+    assert len(response._body_buffer) == 0
+    assert response.method == "HEAD"
+    response.feed("HTTP/1.1 200 Ok\r\nContent-Length: 12\r\n\r\n")
+    assert response.message_complete
+    assert response.status_code == 200
+    assert response["content-length"] == "12"
+    assert response.should_keep_alive()
+
+
+def test_reset_after_error():
+    response = HTTPResponse()
+    with pytest.raises(HTTPException):
+        response.feed("HTTP/1.1 asdf\r\n\r\n")
+    assert response.parser_failed()
+    response.reset()
+    assert not response.parser_failed()
+    response.feed(RESPONSE)
+    assert response.message_complete
+    assert response.status_code == 301
+
+
+def test_reset_partial_headers():
+    response = HTTPResponse()
+    response.feed("HTTP/1.1 200 Ok\r\nX-Partial: some")
+    response.reset()
+    response.feed(RESPONSE)
+    assert "x-partial" not in response
+    assert response["location"] == "http://www.google.fr/"
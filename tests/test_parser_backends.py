@@ -0,0 +1,279 @@
+import gc
+import weakref
+
+import pytest
+
+from geventhttpclient.parser import (
+    PARSERS,
+    HTTPParseError,
+    PyHTTPResponseParser,
+    get_parser_class,
+)
+
+BACKENDS = [
+    pytest.param(
+        parser_class,
+        id=name,
+        marks=pytest.mark.skipif(parser_class is None, reason=f"{name} parser not available"),
+    )
+    for name, parser_class in PARSERS.items()
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def make_parser(request):
+    parser_class = request.param
+
+    class Recorder(parser_class):
+        """Records the callbacks as a list of events."""
+
+        def __init__(self, skip_body=False):
+            super().__init__()
+            self.events = []
+            self.skip_body = skip_body
+
+        def _on_message_begin(self):
+            self.events.append(("begin",))
+
+        def _on_status(self, reason):
+            # the status might arrive in several fragments
+            if self.events[-1][0] == "status":
+                reason = self.events.pop()[1] + reason
+            self.events.append(("status", reason))
+
+        def _on_headers(self, headers):
+            self.events.append(("headers", headers))
+
+        def _on_headers_complete(self):
+            self.events.append(("headers_complete",))
+            return self.skip_body
+
+        def _on_body(self, data):
+            if self.events[-1][0] == "body":
+                self.events[-1] = ("body", self.events[-1][1] + bytes(data))
+            else:
+                self.events.append(("body", bytes(data)))
+
+        def _on_message_complete(self):
+            self.events.append(("complete",))
+
+    return Recorder
+
+
+SIMPLE = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 12\r\n\r\nHello World!"
+
+SIMPLE_EVENTS = [
+    ("begin",),
+    ("status", "OK"),
+    ("headers", [("Content-Type", "text/plain"), ("Content-Length", "12")]),
+    ("headers_complete",),
+    ("body", b"Hello World!"),
+    ("complete",),
+]
+
+
+def test_simple(make_parser):
+    parser = make_parser()
+    parser.feed(SIMPLE)
+    assert parser.events == SIMPLE_EVENTS
+    assert parser.get_code() == 200
+    assert parser.get_http_version() == "HTTP/1.1"
+    assert parser.should_keep_alive()
+    assert not parser.parser_failed()
+
+
+def test_freed_without_gc(make_parser):
+    parser = make_parser()
+    parser.feed(SIMPLE[:80])
+    ref = weakref.ref(parser)
+    gc.disable()
+    try:
+        # no reference cycles, e.g. through bound callbacks
+        del parser
+        assert ref() is None
+    finally:
+        gc.enable()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 30])
+def test_small_blocks(make_parser, size):
+    parser = make_parser()
+    for start in range(0, len(SIMPLE), size):
+        parser.feed(SIMPLE[start : start + size])
+    assert parser.events == SIMPLE_EVENTS
+
+
+@pytest.mark.parametrize(
+    "wrap", [str, bytearray, memoryview], ids=["str", "bytearray", "memoryview"]
+)
+def test_feed_types(make_parser, wrap):
+    parser = make_parser()
+    parser.feed(wrap(SIMPLE.decode()) if wrap is str else wrap(SIMPLE))
+    assert parser.events == SIMPLE_EVENTS
+
+
+def test_feed_invalid_type(make_parser):
+    with pytest.raises(TypeError):
+        make_parser().feed(42)
+
+
+def test_chunked_with_trailers(make_parser):
+    parser = make_parser()
+    parser.feed(
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"5\r\nHello\r\n7;ext=1\r\n World!\r\n0\r\nX-Trailer: yes\r\n\r\n"
+    )
+    assert parser.events == [
+        ("begin",),
+        ("status", "OK"),
+        ("headers", [("Transfer-Encoding", "chunked")]),
+        ("headers_complete",),
+        ("body", b"Hello World!"),
+        ("headers", [("X-Trailer", "yes")]),
+        ("complete",),
+    ]
+    assert parser.should_keep_alive()
+
+
+def test_body_until_eof(make_parser):
+    parser = make_parser()
+    parser.feed(b"HTTP/1.1 200 OK\r\n\r\nsome ")
+    parser.feed(b"data")
+    assert parser.events[-1] == ("body", b"some data")
+    assert not parser.should_keep_alive()
+    parser.feed(b"")
+    assert parser.events[-1] == ("complete",)
+    assert not parser.should_keep_alive()
+
+
+def test_incomplete_body(make_parser):
+    parser = make_parser()
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n1")
+    with pytest.raises(HTTPParseError):
+        parser.feed(b"")
+
+
+@pytest.mark.parametrize("status", [204, 304])
+def test_no_body(make_parser, status):
+    parser = make_parser()
+    parser.feed(b"HTTP/1.1 %d Nothing\r\nX-Test: 1\r\n\r\n" % status)
+    assert parser.events[-1] == ("complete",)
+    assert parser.should_keep_alive()
+
+
+def test_skip_body(make_parser):
+    parser = make_parser(skip_body=True)
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\n")
+    assert parser.events[-2:] == [("headers_complete",), ("complete",)]
+    assert parser.get_code() == 200
+    assert parser.should_keep_alive()
+
+
+def test_skip_body_then_next_response(make_parser):
+    parser = make_parser(skip_body=True)
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\nHTTP/1.1 404 Not Found\r\n")
+    parser.feed(b"Content-Length: 3\r\n\r\n")
+    assert [event[0] for event in parser.events].count("complete") == 2
+    assert parser.get_code() == 404
+
+
+def test_skip_body_then_response_with_body(make_parser):
+    parser = make_parser()
+    skip = [True, False]
+
+    def on_headers_complete():
+        parser.events.append(("headers_complete",))
+        return skip.pop(0)
+
+    parser._on_headers_complete = on_headers_complete
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Length: 12\r\n\r\n" + SIMPLE)
+    assert parser.events[5:] == SIMPLE_EVENTS
+    assert not parser.parser_failed()
+
+
+@pytest.mark.parametrize(
+    "head, keep_alive",
+    [
+        (b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n", True),
+        (b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 0\r\n\r\n", False),
+        (b"HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n", False),
+        (b"HTTP/1.0 200 OK\r\nConnection: keep-alive\r\nContent-Length: 0\r\n\r\n", True),
+    ],
+)
+def test_keep_alive(make_parser, head, keep_alive):
+    parser = make_parser()
+    parser.feed(head)
+    assert parser.events[-1] == ("complete",)
+    assert parser.should_keep_alive() is keep_alive
+
+
+def test_http_10_version(make_parser):
+    parser = make_parser()
+    parser.feed(b"HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n")
+    assert parser.get_http_version() == "HTTP/1.0"
+
+
+def test_keep_alive_sequence(make_parser):
+    parser = make_parser()
+    parser.feed(SIMPLE + SIMPLE)
+    assert parser.events == SIMPLE_EVENTS + SIMPLE_EVENTS
+
+
+def test_invalid_status(make_parser):
+    parser = make_parser()
+    with pytest.raises(HTTPParseError):
+        parser.feed(b"HTTP/1.1 asdf\r\n\r\n")
+    assert parser.parser_failed()
+    assert not parser.should_keep_alive()
+    # further data raises the same error again
+    with pytest.raises(HTTPParseError):
+        parser.feed(SIMPLE)
+
+
+def test_invalid_chunk_size(make_parser):
+    parser = make_parser()
+    with pytest.raises(HTTPParseError):
+        parser.feed(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nxyz\r\n")
+
+
+def test_callback_exception(make_parser):
+    parser = make_parser()
+
+    def on_body(data):
+        raise ZeroDivisionError()
+
+    parser._on_body = on_body
+    with pytest.raises(ZeroDivisionError):
+        parser.feed(SIMPLE)
+    assert parser.parser_failed()
+
+
+def test_zero_copy_body(make_parser):
+    parser = make_parser()
+    parser.zero_copy_body = True
+    views = []
+    parser._on_body = views.append
+    parser.feed(SIMPLE)
+    assert views
+    assert all(isinstance(view, memoryview) for view in views)
+    with pytest.raises(ValueError):
+        bytes(views[0])
+
+
+def test_reset(make_parser):
+    parser = make_parser()
+    parser.feed(b"HTTP/1.1 200 OK\r\nContent-Len")
+    parser.reset()
+    parser.events.clear()
+    parser.feed(SIMPLE)
+    assert parser.events == SIMPLE_EVENTS
+
+
+def test_get_parser_class(monkeypatch):
+    assert get_parser_class("python") is PyHTTPResponseParser
+    with pytest.raises(ValueError):
+        get_parser_class("unknown")
+    monkeypatch.setenv("GEVENTHTTPCLIENT_PARSER", "python")
+    assert get_parser_class() is PyHTTPResponseParser
+    monkeypatch.delenv("GEVENTHTTPCLIENT_PARSER")
+    assert get_parser_class() is (PARSERS["c"] or PyHTTPResponseParser)
@@ -1,8 +1,46 @@
+import gevent
 import pytest
 
 from geventhttpclient.header import Headers
 from geventhttpclient.requests import Session
-from tests.common import HTTPBIN_HOST
+from geventhttpclient.response import HTTPDeadlineExceeded
+from geventhttpclient.useragent import RetriesExceeded
+from tests.common import HTTPBIN_HOST, LISTENER_URL, wsgiserver
+
+
+def test_generator_data():
+    def wsgi_handler(env, start_response):
+        assert env["HTTP_TRANSFER_ENCODING"] == "chunked"
+        start_response("200 OK", [])
+        return [env["wsgi.input"].read()]
+
+    with wsgiserver(wsgi_handler):
+        response = Session().post(LISTENER_URL, data=(chunk for chunk in [b"12", b"345"]))
+        assert response.status_code == 200
+        assert response.content == b"12345"
+
+
+def test_timeout():
+    def wsgi_handler(env, start_response):
+        start_response("200 OK", [("Content-Length", "10")])
+        for _ in range(10):
+            gevent.sleep(0.05)
+            yield b"x"
+
+    with wsgiserver(wsgi_handler):
+        session = Session(max_retries=0)
+        assert session.get(LISTENER_URL, timeout=2).content == b"x" * 10
+        with pytest.raises(HTTPDeadlineExceeded):
+            session.get(LISTENER_URL, timeout=0.2, stream=False)
+        # reading the body later on is bounded as well
+        response = session.get(LISTENER_URL, timeout=0.2)
+        with pytest.raises(HTTPDeadlineExceeded):
+            response.content
+        # (connect, read) timeouts apply per socket operation
+        response = session.get(LISTENER_URL, timeout=(1, 0.2), stream=False)
+        assert response.content == b"x" * 10
+        with pytest.raises(RetriesExceeded):
+            session.get(LISTENER_URL, timeout=(1, 0.01), stream=False)
 
 
 @pytest.mark.network
@@ -0,0 +1,119 @@
+import gevent
+import gevent.socket
+import pytest
+
+from geventhttpclient.client import HTTPClient
+from geventhttpclient.resolver import CachingResolver
+from tests.common import LISTENER, server
+
+
+class FakeDNS:
+    """getaddrinfo() answering with a counter, optionally slow or failing."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self, host, port, family=0, type=0, proto=0, flags=0):
+        self.calls += 1
+        if self.delay:
+            gevent.sleep(self.delay)
+        if self.fail:
+            raise gevent.socket.gaierror(-2, "Name or service not known")
+        return [(gevent.socket.AF_INET, gevent.socket.SOCK_STREAM, 6, "", (host, self.calls))]
+
+
+def test_cache_hit():
+    dns = FakeDNS()
+    resolver = CachingResolver(getaddrinfo=dns)
+    first = resolver.getaddrinfo("example.com", 80)
+    assert resolver.getaddrinfo("example.com", 80) == first
+    resolver.getaddrinfo("example.com", 443)
+    assert dns.calls == 2
+    assert resolver.stats() == {"size": 2, "hits": 1, "stale_hits": 0, "misses": 2, "errors": 0}
+
+
+def test_ttl_expired():
+    dns = FakeDNS()
+    resolver = CachingResolver(ttl=0.02, stale_ttl=0, getaddrinfo=dns)
+    resolver.getaddrinfo("example.com", 80)
+    gevent.sleep(0.03)
+    assert resolver.getaddrinfo("example.com", 80)[0][-1] == ("example.com", 2)
+    assert resolver.misses == 2
+
+
+def test_negative_cache():
+    dns = FakeDNS()
+    dns.fail = True
+    resolver = CachingResolver(negative_ttl=0.02, getaddrinfo=dns)
+    for _ in range(3):
+        with pytest.raises(gevent.socket.gaierror):
+            resolver.getaddrinfo("unknown.invalid", 80)
+    assert dns.calls == 1
+    assert resolver.errors == 1
+    dns.fail = False
+    gevent.sleep(0.03)
+    assert resolver.getaddrinfo("unknown.invalid", 80)
+
+
+def test_stale_while_revalidate():
+    dns = FakeDNS(delay=0.02)
+    resolver = CachingResolver(ttl=0.01, stale_ttl=10, getaddrinfo=dns)
+    resolver.getaddrinfo("example.com", 80)
+    gevent.sleep(0.02)
+    with gevent.Timeout(0.01):
+        # expired, but served right away
+        assert resolver.getaddrinfo("example.com", 80)[0][-1] == ("example.com", 1)
+    gevent.sleep(0.03)
+    assert resolver.stale_hits == 1
+    assert dns.calls == 2
+    assert resolver.getaddrinfo("example.com", 80)[0][-1] == ("example.com", 2)
+
+
+def test_failed_refresh_keeps_stale_result():
+    dns = FakeDNS()
+    resolver = CachingResolver(ttl=0.01, stale_ttl=10, getaddrinfo=dns)
+    resolver.getaddrinfo("example.com", 80)
+    dns.fail = True
+    gevent.sleep(0.02)
+    for _ in range(2):
+        assert resolver.getaddrinfo("example.com", 80)[0][-1] == ("example.com", 1)
+        gevent.sleep(0)
+    assert resolver.errors == 2
+
+
+def test_concurrent_lookups_coalesce():
+    dns = FakeDNS(delay=0.02)
+    resolver = CachingResolver(getaddrinfo=dns)
+    lookups = [gevent.spawn(resolver.getaddrinfo, "example.com", 80) for _ in range(5)]
+    gevent.joinall(lookups, raise_error=True)
+    assert dns.calls == 1
+    assert len({id(lookup.value) for lookup in lookups}) == 1
+
+
+def test_max_size():
+    resolver = CachingResolver(max_size=2, getaddrinfo=FakeDNS())
+    for port in (1, 2, 3):
+        resolver.getaddrinfo("example.com", port)
+    assert [key[1] for key in resolver._entries] == [2, 3]
+
+
+def test_shared_by_clients():
+    def ok_response(sock, addr):
+        sock.recv(4096)
+        sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 2\r\n\r\nok")
+
+    calls = []
+
+    def getaddrinfo(*args):
+        calls.append(args)
+        return gevent.socket.getaddrinfo(*args)
+
+    resolver = CachingResolver(getaddrinfo=getaddrinfo)
+    with server(ok_response):
+        for _ in range(3):
+            client = HTTPClient(*LISTENER, resolver=resolver)
+            assert client.get("/").read() == b"ok"
+            client.close()
+    assert len(calls) == 1
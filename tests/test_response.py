@@ -0,0 +1,63 @@
+import pytest
+
+from geventhttpclient.response import BodyBuffer
+
+
+def make_buffer(*chunks):
+    buf = BodyBuffer()
+    for chunk in chunks:
+        buf.append(chunk)
+    return buf
+
+
+def test_body_buffer_read():
+    buf = make_buffer(b"0123", bytearray(b"4567"), memoryview(b"89"))
+    assert len(buf) == 10
+    assert buf.read(3) == b"012"
+    assert buf.read(3) == b"345"
+    assert bytes(buf) == b"6789"
+    assert buf.read(100) == b"6789"
+    assert len(buf) == 0
+    assert buf.read() == b""
+
+
+def test_body_buffer_read_all():
+    buf = make_buffer(b"0123", b"4567")
+    buf.read(1)
+    assert buf.read() == b"1234567"
+    assert not buf
+
+
+def test_body_buffer_readinto():
+    buf = make_buffer(b"0123", b"4567", b"89")
+    target = bytearray(7)
+    assert buf.readinto(memoryview(target)) == 7
+    assert target == b"0123456"
+    assert buf.readinto(memoryview(target)) == 3
+    assert target[:3] == b"789"
+    assert buf.readinto(memoryview(target)) == 0
+
+
+def test_body_buffer_ignores_empty_chunks():
+    buf = make_buffer(b"", b"ab", b"")
+    assert buf.read() == b"ab"
+
+
+@pytest.mark.parametrize("sub", [b"\n", b"\r\n", b"abc"])
+@pytest.mark.parametrize("start", [0, 1, 3, 5])
+def test_body_buffer_find(sub, start):
+    data = b"xx" + sub + b"y" + sub + b"zz"
+    for size in range(1, len(data) + 1):
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        buf = make_buffer(b"-", *chunks)
+        buf.read(1)
+        assert buf.find(sub, start) == data.find(sub, start), chunks
+    assert make_buffer(b"xx").find(sub) == -1
+
+
+def test_body_buffer_skip():
+    buf = make_buffer(b"0123", b"4567")
+    buf.skip(5)
+    assert buf.read() == b"567"
+    buf.skip(1)
+    assert len(buf) == 0
@@ -90,6 +90,24 @@ def test_simple_ssl():
         response.read()
 
 
+def test_ssl_post_body_parts():
+    body = [b"x" * 100000, b"y" * 10]
+
+    def check_body(sock, addr):
+        data = b""
+        while not data.endswith(b"y" * 10):
+            data += sock.recv(65536)
+        head, _, received = data.partition(b"\r\n\r\n")
+        assert b"Content-Length: 100010" in head
+        assert received == b"".join(body)
+        sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 0\r\n\r\n")
+
+    with sslserver(check_body) as listener:
+        client = HTTPClient(*listener, insecure=True, ssl=True, ssl_options={"ca_certs": CERT})
+        response = client.post("/", body)
+        assert response.status_code == 200
+
+
 def timeout_on_connect(sock, addr):
     sock.recv(1024)
     sock.sendall(b"HTTP/1.1 200 Ok\r\nContent-Length: 0\r\n\r\n")
@@ -1,8 +1,11 @@
+import time
 from http.cookiejar import CookieJar
 
+import gevent
 import pytest
 
 from geventhttpclient.header import Headers
+from geventhttpclient.response import HTTPDeadlineExceeded
 from geventhttpclient.useragent import BadStatusCode, UserAgent
 from tests.common import HTTPBIN_HOST, LISTENER_URL, check_upload, wsgiserver
 
@@ -93,6 +96,25 @@ def test_bytes_post():
         useragent.urlopen(LISTENER_URL, method="POST", payload=b"12345")
 
 
+def test_generator_post():
+    def wsgi_handler(env, start_response):
+        assert env["HTTP_TRANSFER_ENCODING"] == "chunked"
+        assert env["CONTENT_TYPE"] == "application/octet-stream"
+        assert env["wsgi.input"].read() == b"12345"
+        start_response("200 OK", [])
+        return []
+
+    with wsgiserver(wsgi_handler):
+        resp = UserAgent().urlopen(LISTENER_URL, method="POST", payload=iter([b"123", b"45"]))
+        assert resp.status_code == 200
+
+
+def test_generator_post_redirect():
+    with wsgiserver(check_redirect()):
+        with pytest.raises(ValueError):
+            UserAgent().urlopen(LISTENER_URL, method="POST", payload=iter([b"12345"]))
+
+
 def test_dict_post_with_content_type():
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     payload = {"foo": "bar"}
@@ -190,6 +212,29 @@ def test_redirect():
         assert b"redirected" == resp.content
 
 
+def test_timeout_spans_redirects_and_retries():
+    requests = []
+
+    def wsgi_handler(env, start_response):
+        requests.append(env["PATH_INFO"])
+        if env["PATH_INFO"] == "/":
+            start_response("302 Found", [("Location", "/slow")])
+            return []
+        gevent.sleep(0.2)
+        start_response("200 OK", [])
+        return [b"slow"]
+
+    with wsgiserver(wsgi_handler):
+        useragent = UserAgent(max_retries=5, retry_delay=1, network_timeout=0.15)
+        start = time.monotonic()
+        with pytest.raises(HTTPDeadlineExceeded):
+            useragent.urlopen(LISTENER_URL, timeout=0.5)
+        assert time.monotonic() - start < 0.7
+        # the network timeout of /slow got retried, within the deadline
+        assert requests[:2] == ["/", "/slow"]
+        assert len(requests) < 12
+
+
 def test_params():
     with wsgiserver(check_querystring()):
         resp = UserAgent().urlopen(LISTENER_URL + "?param1=b", params={"param2": "hello"})